@@ -3,31 +3,183 @@ Example RTSP Stream Consumer
 Demonstrates how to consume RTSP streams for AI pipeline testing
 """
 
+import os
 import cv2
+import numpy as np
 import time
 import argparse
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from threading import Thread, Event
+from typing import Optional
 from loguru import logger
 
+from overlay import render_hud, blit_hud, enable_opencl, upload_hud, blit_hud_umat
+
+
+# Low-latency FFmpeg demuxer options (skip input buffering and probing)
+# plus frame-threaded decoding across all available cores
+FFMPEG_CAPTURE_OPTIONS = (
+    "rtsp_transport;tcp|fflags;nobuffer|flags;low_delay|max_delay;0|reorder_queue_size;0"
+    "|threads;auto|thread_type;frame"
+)
+# OpenCV reads the options whenever an FFmpeg capture is created; set them
+# once here since captures are opened from worker threads
+os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = FFMPEG_CAPTURE_OPTIONS
+
+HUD_SIZE = (40, 480)  # (height, width) of the cached overlay strip
+HUD_REFRESH = 5  # Re-render overlay text every N displayed frames
+HUD_FORMAT = "Frame: %d | FPS: %.1f | Errors: %d"
+MOSAIC_TILE = (640, 360)  # (width, height) of each stream in the mosaic
+RING_SIZE = 4  # Frame slots shared between the reader thread and the display loop
+
+
+def open_capture(rtsp_url: str, buffer_size: int = 1) -> cv2.VideoCapture:
+    """Open an RTSP capture with the low-latency FFmpeg options"""
+    cap = cv2.VideoCapture(rtsp_url, cv2.CAP_FFMPEG)
+    
+    # Keep the internal queue short so reads don't return stale frames
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return cap
+
+
+LIVE_GRAB_THRESHOLD = 0.002  # A grab() faster than this came from the buffer
+LIVE_MAX_DRAIN = 30  # Upper bound on buffered frames skipped per read
+
+
+def read_live(cap, image=None):
+    """
+    Read the newest frame, skipping frames that were already buffered
+
+    Buffered frames come back from grab() almost instantly while a live frame
+    takes roughly a frame interval, so keep grabbing until a grab blocks.
+    """
+    start = time.monotonic()
+    ret = cap.grab()
+    for _ in range(LIVE_MAX_DRAIN):
+        if not ret or time.monotonic() - start >= LIVE_GRAB_THRESHOLD:
+            break
+        start = time.monotonic()
+        ret = cap.grab()
+
+    if not ret:
+        return False, None
+    return cap.retrieve(image)
+
 
 class RTSPConsumer:
     """Simple RTSP stream consumer for testing"""
     
-    def __init__(self, rtsp_url: str, display: bool = True):
+    def __init__(
+        self,
+        rtsp_url: str,
+        display: bool = True,
+        buffer_size: int = 1,
+        low_latency: bool = False,
+        cap: Optional[cv2.VideoCapture] = None,
+        accel: str = "none"
+    ):
         """
         Initialize RTSP consumer
         
         Args:
             rtsp_url: RTSP stream URL
             display: Whether to display video window
+            buffer_size: Capture buffer size in frames (1 = always freshest frame)
+            low_latency: Skip buffered frames to stay on the live edge
+            cap: Already opened capture for rtsp_url (opened on consume if None)
+            accel: Overlay acceleration backend ("none" or "opencl")
         """
         self.rtsp_url = rtsp_url
         self.display = display
+        self.buffer_size = buffer_size
+        self.low_latency = low_latency
+        self.cap = cap
+        self.accel = accel
         self.running = Event()
         self.frame_count = 0
         self.error_count = 0
         self.start_time = None
+        # Single-producer/single-consumer ring of reusable frame buffers.
+        # _head counts frames written by the reader and _latest is the slot
+        # of the newest one; _tail marks the last frame taken by the display
+        # loop and _held the slot it is drawing on, which the reader skips.
+        # Plain int stores are atomic under the GIL.
+        self._ring = [None] * RING_SIZE
+        self._head = 0
+        self._latest = RING_SIZE - 1
+        self._tail = 0
+        self._held = -1
+        self._hud = None
+        self._displayed = 0
+        
+    def _reader(self, cap):
+        """Continuously decode frames into the ring, overwriting the oldest slot"""
+        running = self.running.is_set
+        if self.low_latency:
+            read = partial(read_live, cap)
+        else:
+            read = cap.read
+        ring = self._ring
+        head = self._head
+        index = self._latest
         
+        while running():
+            index = (index + 1) % RING_SIZE
+            if index == self._held:
+                # Never decode over the frame the display loop is drawing on
+                index = (index + 1) % RING_SIZE
+            ret, frame = read(ring[index])
+            
+            if not ret:
+                logger.warning("Failed to read frame")
+                self.error_count += 1
+                
+                if self.error_count > 10:
+                    logger.error("Too many errors, stopping")
+                    self.running.clear()
+                    break
+                
+                # Retry the same slot so failures never lap the ring
+                index = self._latest
+                time.sleep(0.1)
+                continue
+            
+            # Frames decode straight into the slot; it is only replaced on
+            # the first lap or when the stream resolution changes
+            if frame is not ring[index]:
+                ring[index] = frame
+            
+            head += 1
+            self.frame_count += 1
+            # Publish only after the slot is fully written
+            self._latest = index
+            self._head = head
+    
+    def _peek_latest(self):
+        """Return the newest frame without marking it as seen"""
+        return self._ring[self._latest] if self._head else None
+    
+    def _take_latest(self):
+        """
+        Return the newest unseen frame, or None if there is none
+        
+        The returned buffer stays reserved for the caller, who may draw on
+        it, until the next call.
+        """
+        head = self._head
+        if head == self._tail:
+            return None
+        self._tail = head
+        index = self._latest
+        self._held = index
+        return self._ring[index]
+    
+    def take_latest(self):
+        """Return the newest unseen frame for an external viewer (e.g. a mosaic)"""
+        return self._take_latest()
+    
     def consume(self, duration: int = 0):
         """
         Consume stream for specified duration
@@ -35,66 +187,91 @@ class RTSPConsumer:
         Args:
             duration: Duration in seconds (0 = infinite)
         """
-        logger.info(f"Connecting to: {self.rtsp_url}")
-        
-        cap = cv2.VideoCapture(self.rtsp_url)
+        if self.cap is None:
+            logger.info(f"Connecting to: {self.rtsp_url}")
+            self.cap = open_capture(self.rtsp_url, self.buffer_size)
+        cap = self.cap
         
         if not cap.isOpened():
             logger.error(f"Failed to open stream: {self.rtsp_url}")
             return
         
-        # Get stream properties
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        
-        logger.info(f"Stream opened: {width}x{height} @ {fps}fps")
-        
         self.running.set()
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
+        
+        # Decode on a separate thread so display stalls don't age frames
+        reader = Thread(target=self._reader, args=(cap,), daemon=True)
+        reader.start()
         
-        last_report = time.time()
+        last_report = self.start_time
         report_interval = 5  # Report every 5 seconds
         
+        # Bind hot-loop lookups to locals
+        running = self.running.is_set
+        take_latest = self._take_latest
+        monotonic = time.monotonic
+        sleep = time.sleep
+        imshow = cv2.imshow
+        waitKey = cv2.waitKey
+        window_name = f'RTSP Stream: {self.rtsp_url}'
+        quit_key = ord('q')
+        
+        # Stream properties are taken from real frames rather than cap.get()
+        info_pending = True
+        
+        use_opencl = self.display and self.accel == "opencl" and enable_opencl()
+        if self.display and self.accel == "opencl" and not use_opencl:
+            logger.warning("OpenCL not available, drawing overlay on the CPU")
+        
         try:
-            while self.running.is_set():
-                ret, frame = cap.read()
+            while running():
+                # Sample the clock once per iteration
+                now = monotonic()
+                elapsed = now - self.start_time
                 
-                if not ret:
-                    logger.warning("Failed to read frame")
-                    self.error_count += 1
-                    
-                    if self.error_count > 10:
-                        logger.error("Too many errors, stopping")
-                        break
-                    
-                    time.sleep(0.1)
-                    continue
+                if self.display:
+                    frame = take_latest()
+                else:
+                    # Leave frames in place for external viewers such as the mosaic
+                    frame = self._peek_latest()
                 
-                self.frame_count += 1
+                if info_pending and frame is not None and elapsed >= 1.0:
+                    logger.info(
+                        f"Stream opened: {frame.shape[1]}x{frame.shape[0]} "
+                        f"@ {self.frame_count / elapsed:.1f}fps (measured)"
+                    )
+                    info_pending = False
                 
-                # Add frame info overlay
-                if self.display:
-                    elapsed = time.time() - self.start_time
-                    current_fps = self.frame_count / elapsed if elapsed > 0 else 0
+                if frame is None or not self.display:
+                    sleep(0.005)
+                else:
+                    # Add frame info overlay, re-rendering the text only every few frames
+                    if self._hud is None or self._displayed % HUD_REFRESH == 0:
+                        current_fps = self.frame_count / elapsed if elapsed > 0 else 0
+                        
+                        self._hud = render_hud(
+                            [HUD_FORMAT % (self.frame_count, current_fps, self.error_count)],
+                            HUD_SIZE,
+                            font_scale=0.7
+                        )
+                        if use_opencl:
+                            self._hud = upload_hud(self._hud)
                     
-                    info_text = f"Frame: {self.frame_count} | FPS: {current_fps:.1f} | Errors: {self.error_count}"
-                    cv2.putText(
-                        frame, info_text, (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2
-                    )
+                    if use_opencl:
+                        frame = blit_hud_umat(frame, self._hud)
+                    else:
+                        blit_hud(frame, self._hud)
+                    self._displayed += 1
                     
-                    cv2.imshow(f'RTSP Stream: {self.rtsp_url}', frame)
+                    imshow(window_name, frame)
                     
                     # Exit on 'q' key
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                    if waitKey(1) & 0xFF == quit_key:
                         logger.info("User requested exit")
                         break
                 
                 # Periodic status report
-                current_time = time.time()
-                if current_time - last_report >= report_interval:
-                    elapsed = current_time - self.start_time
+                if now - last_report >= report_interval:
                     current_fps = self.frame_count / elapsed if elapsed > 0 else 0
                     
                     logger.info(
@@ -103,10 +280,10 @@ class RTSPConsumer:
                         f"Errors={self.error_count}, "
                         f"Elapsed={elapsed:.1f}s"
                     )
-                    last_report = current_time
+                    last_report = now
                 
                 # Check duration limit
-                if duration > 0 and (time.time() - self.start_time) >= duration:
+                if duration > 0 and elapsed >= duration:
                     logger.info(f"Duration limit reached ({duration}s)")
                     break
                 
@@ -115,6 +292,8 @@ class RTSPConsumer:
         except Exception as e:
             logger.error(f"Error consuming stream: {e}")
         finally:
+            self.running.clear()
+            reader.join(timeout=2)
             cap.release()
             if self.display:
                 cv2.destroyAllWindows()
@@ -123,7 +302,7 @@ class RTSPConsumer:
     
     def _print_summary(self):
         """Print consumption summary"""
-        elapsed = time.time() - self.start_time if self.start_time else 0
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0
         avg_fps = self.frame_count / elapsed if elapsed > 0 else 0
         
         logger.info("=" * 60)
@@ -144,16 +323,29 @@ class RTSPConsumer:
 class MultiStreamConsumer:
     """Consume multiple RTSP streams in parallel"""
     
-    def __init__(self, stream_urls: list, display: bool = True):
+    def __init__(
+        self,
+        stream_urls: list,
+        display: bool = True,
+        buffer_size: int = 1,
+        low_latency: bool = False,
+        accel: str = "none"
+    ):
         """
         Initialize multi-stream consumer
         
         Args:
             stream_urls: List of RTSP stream URLs
-            display: Whether to display video windows
+            display: Whether to display all streams in a single mosaic window
+            buffer_size: Capture buffer size in frames for each stream
+            low_latency: Skip buffered frames to stay on the live edge
+            accel: Overlay acceleration backend ("none" or "opencl")
         """
         self.stream_urls = stream_urls
         self.display = display
+        self.buffer_size = buffer_size
+        self.low_latency = low_latency
+        self.accel = accel
         self.consumers = []
         self.threads = []
     
@@ -166,26 +358,71 @@ class MultiStreamConsumer:
         """
         logger.info(f"Starting consumption of {len(self.stream_urls)} streams")
         
-        for url in self.stream_urls:
-            consumer = RTSPConsumer(url, self.display)
+        # Open all streams concurrently so the RTSP handshakes overlap
+        with ThreadPoolExecutor(max_workers=len(self.stream_urls)) as pool:
+            caps = list(pool.map(
+                partial(open_capture, buffer_size=self.buffer_size),
+                self.stream_urls
+            ))
+        
+        # Consumers only decode; the mosaic below is the single display
+        for url, cap in zip(self.stream_urls, caps):
+            consumer = RTSPConsumer(
+                url, False, self.buffer_size, self.low_latency,
+                cap=cap, accel=self.accel
+            )
             thread = Thread(target=consumer.consume, args=(duration,), daemon=True)
             
             self.consumers.append(consumer)
             self.threads.append(thread)
             
             thread.start()
-            time.sleep(0.5)  # Small delay between starts
         
         logger.info("All consumers started")
         
         # Wait for all threads
         try:
+            if self.display:
+                self._show_mosaic()
             for thread in self.threads:
                 thread.join()
         except KeyboardInterrupt:
             logger.info("Stopping all consumers...")
             self.stop()
     
+    def _show_mosaic(self):
+        """Composite the newest frame of every stream into one window"""
+        tile_w, tile_h = MOSAIC_TILE
+        cols = math.ceil(math.sqrt(len(self.consumers)))
+        rows = math.ceil(len(self.consumers) / cols)
+        canvas = np.zeros((tile_h * rows, tile_w * cols, 3), dtype=np.uint8)
+        tiles = [
+            canvas[r * tile_h:(r + 1) * tile_h, c * tile_w:(c + 1) * tile_w]
+            for r, c in (divmod(i, cols) for i in range(len(self.consumers)))
+        ]
+        
+        try:
+            while any(thread.is_alive() for thread in self.threads):
+                updated = False
+                for consumer, tile in zip(self.consumers, tiles):
+                    frame = consumer.take_latest()
+                    if frame is not None:
+                        cv2.resize(frame, MOSAIC_TILE, dst=tile)
+                        updated = True
+                
+                if updated:
+                    cv2.imshow('RTSP Mosaic', canvas)
+                else:
+                    time.sleep(0.005)
+                
+                # Exit on 'q' key
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    logger.info("User requested exit")
+                    self.stop()
+                    break
+        finally:
+            cv2.destroyAllWindows()
+    
     def stop(self):
         """Stop all consumers"""
         for consumer in self.consumers:
@@ -213,6 +450,17 @@ def main():
         default=0,
         help="Duration in seconds (0 = infinite)"
     )
+    parser.add_argument(
+        "--low-latency",
+        action="store_true",
+        help="Skip buffered frames to always process the newest one"
+    )
+    parser.add_argument(
+        "--accel",
+        choices=["none", "opencl"],
+        default="none",
+        help="Draw the overlay with OpenCL (falls back to CPU if unavailable)"
+    )
     
     args = parser.parse_args()
     
@@ -220,11 +468,15 @@ def main():
     
     if len(args.urls) == 1:
         # Single stream
-        consumer = RTSPConsumer(args.urls[0], display)
+        consumer = RTSPConsumer(
+            args.urls[0], display, low_latency=args.low_latency, accel=args.accel
+        )
         consumer.consume(duration=args.duration)
     else:
         # Multiple streams
-        consumer = MultiStreamConsumer(args.urls, display)
+        consumer = MultiStreamConsumer(
+            args.urls, display, low_latency=args.low_latency, accel=args.accel
+        )
         consumer.start(duration=args.duration)
 
 
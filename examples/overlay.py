@@ -0,0 +1,72 @@
+"""
+Cached HUD Overlay Helpers
+Shared by the consumer examples to draw stats onto frames cheaply
+"""
+
+import cv2
+import numpy as np
+
+
+HUD_FONT = cv2.FONT_HERSHEY_SIMPLEX
+HUD_COLOR = (0, 255, 0)
+HUD_LINE_HEIGHT = 40  # Vertical spacing between overlay lines in pixels
+
+
+def render_hud(lines, size, font_scale: float = 1.0):
+    """
+    Rasterize overlay lines once into a strip and its mask
+
+    Args:
+        lines: Text lines drawn top to bottom
+        size: (height, width) of the strip
+        font_scale: OpenCV font scale for the text
+    """
+    strip = np.zeros((size[0], size[1], 3), dtype=np.uint8)
+    for row, text in enumerate(lines):
+        cv2.putText(
+            strip,
+            text,
+            (10, 30 + HUD_LINE_HEIGHT * row),
+            HUD_FONT,
+            font_scale,
+            HUD_COLOR,
+            2
+        )
+    return strip, strip.any(axis=2, keepdims=True)
+
+
+def blit_hud(frame, hud):
+    """Copy a cached overlay strip onto the top-left corner of a frame"""
+    strip, mask = hud
+    h = min(strip.shape[0], frame.shape[0])
+    w = min(strip.shape[1], frame.shape[1])
+    np.copyto(frame[:h, :w], strip[:h, :w], where=mask[:h, :w])
+
+
+def enable_opencl() -> bool:
+    """Turn on OpenCV's OpenCL T-API, returning False if no device is usable"""
+    if not cv2.ocl.haveOpenCL():
+        return False
+    cv2.ocl.setUseOpenCL(True)
+    # The request is ignored when no device can actually be initialized
+    return cv2.ocl.useOpenCL()
+
+
+def upload_hud(hud):
+    """Move a cached overlay strip and its mask to the OpenCL device"""
+    strip, mask = hud
+    return cv2.UMat(strip), cv2.UMat(mask[:, :, 0].astype(np.uint8)), strip.shape[:2]
+
+
+def blit_hud_umat(frame, hud):
+    """Upload a frame and copy a device-resident overlay strip onto it"""
+    strip, mask, size = hud
+    h = min(size[0], frame.shape[0])
+    w = min(size[1], frame.shape[1])
+    uframe = cv2.UMat(frame)
+    cv2.copyTo(
+        cv2.UMat(strip, (0, h), (0, w)),
+        cv2.UMat(mask, (0, h), (0, w)),
+        cv2.UMat(uframe, (0, h), (0, w))
+    )
+    return uframe
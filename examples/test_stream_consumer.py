@@ -4,14 +4,87 @@ Simple RTSP Stream Consumer Test Script
 Tests consuming streams from the RTSP load tester
 """
 
+import os
 import cv2
+import numpy as np
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import sys
 import time
 from datetime import datetime
+from threading import Lock
+
+from overlay import (
+    HUD_FONT, HUD_COLOR, render_hud, blit_hud, enable_opencl, upload_hud, blit_hud_umat
+)
+
+# Optional GStreamer support for event-driven multi-stream consumption
+try:
+    import gi
+    gi.require_version('Gst', '1.0')
+    from gi.repository import Gst, GLib
+    HAS_GSTREAMER = True
+except (ImportError, ValueError):
+    HAS_GSTREAMER = False
+
+
+# Low-latency FFmpeg demuxer options (skip input buffering and probing)
+# plus frame-threaded decoding across all available cores
+FFMPEG_CAPTURE_OPTIONS = (
+    "rtsp_transport;tcp|fflags;nobuffer|flags;low_delay|max_delay;0|reorder_queue_size;0"
+    "|threads;auto|thread_type;frame"
+)
+# OpenCV reads the options whenever an FFmpeg capture is created; set them
+# once here since captures are opened from worker threads
+os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = FFMPEG_CAPTURE_OPTIONS
+
+HUD_SIZE = (80, 320)  # (height, width) of the cached overlay strip
+HUD_REFRESH = 5  # Re-render overlay text every N frames
+HUD_FPS_FORMAT = "FPS: %.1f"
+HUD_FRAME_FORMAT = "Frame: %d"
+
+
+def open_capture(stream_url):
+    """Open an RTSP capture with the FFmpeg backend so the options are honored"""
+    cap = cv2.VideoCapture(stream_url, cv2.CAP_FFMPEG)
+
+    # Set buffer size to minimize latency
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
+    return cap
 
 
-def test_single_stream(stream_url, duration=None, show_fps=True):
+LIVE_GRAB_THRESHOLD = 0.002  # A grab() faster than this came from the buffer
+LIVE_MAX_DRAIN = 30  # Upper bound on buffered frames skipped per read
+
+
+def read_live(cap):
+    """
+    Read the newest frame, skipping frames that were already buffered
+
+    Buffered frames come back from grab() almost instantly while a live frame
+    takes roughly a frame interval, so keep grabbing until a grab blocks.
+    """
+    start = time.monotonic()
+    ret = cap.grab()
+    for _ in range(LIVE_MAX_DRAIN):
+        if not ret or time.monotonic() - start >= LIVE_GRAB_THRESHOLD:
+            break
+        start = time.monotonic()
+        ret = cap.grab()
+
+    if not ret:
+        return False, None
+    return cap.retrieve()
+
+
+def test_single_stream(
+    stream_url,
+    duration=None,
+    show_fps=True,
+    low_latency=False,
+    accel="none"
+):
     """
     Test consuming a single RTSP stream
 
@@ -19,45 +92,55 @@ def test_single_stream(stream_url, duration=None, show_fps=True):
         stream_url: RTSP URL to consume
         duration: Optional duration in seconds (None = infinite)
         show_fps: Whether to display FPS counter
+        low_latency: Skip buffered frames to stay on the live edge
+        accel: Overlay acceleration backend ("none" or "opencl")
     """
     print(f"\n{'='*60}")
     print(f"Testing Stream: {stream_url}")
     print(f"{'='*60}\n")
 
     # Open video capture
-    cap = cv2.VideoCapture(stream_url)
-
-    # Set buffer size to minimize latency
-    cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
+    cap = open_capture(stream_url)
 
     if not cap.isOpened():
         print(f"❌ ERROR: Could not open stream: {stream_url}")
         return False
 
-    # Get stream properties
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-
     print(f"✓ Stream opened successfully")
-    print(f"  Resolution: {width}x{height}")
-    print(f"  FPS: {fps}")
     print(f"\nPress 'q' to quit, 's' to take screenshot\n")
 
-    start_time = time.time()
+    start_time = time.monotonic()
     frame_count = 0
-    last_fps_time = time.time()
+    last_fps_time = start_time
     fps_counter = 0
     current_fps = 0
+    hud = None
+
+    # Bind hot-loop lookups to locals
+    if low_latency:
+        read = partial(read_live, cap)
+    else:
+        read = cap.read
+    imshow = cv2.imshow
+    waitKey = cv2.waitKey
+    monotonic = time.monotonic
+    window_name = f'Stream: {stream_url}'
+
+    use_opencl = show_fps and accel == "opencl" and enable_opencl()
+    if show_fps and accel == "opencl" and not use_opencl:
+        print("⚠ OpenCL not available, drawing overlay on the CPU")
 
     try:
         while True:
+            # Sample the clock once per iteration
+            now = monotonic()
+
             # Check duration limit
-            if duration and (time.time() - start_time) >= duration:
+            if duration and (now - start_time) >= duration:
                 print(f"\n✓ Duration limit reached ({duration}s)")
                 break
 
-            ret, frame = cap.read()
+            ret, frame = read()
 
             if not ret:
                 print("\n❌ Failed to grab frame - stream may have ended")
@@ -66,38 +149,38 @@ def test_single_stream(stream_url, duration=None, show_fps=True):
             frame_count += 1
             fps_counter += 1
 
+            # Stream properties are taken from real frames rather than cap.get()
+            if frame_count == 1:
+                print(f"  Resolution: {frame.shape[1]}x{frame.shape[0]}")
+
             # Calculate FPS
-            if time.time() - last_fps_time >= 1.0:
-                current_fps = fps_counter / (time.time() - last_fps_time)
+            if now - last_fps_time >= 1.0:
+                current_fps = fps_counter / (now - last_fps_time)
+                if last_fps_time == start_time:
+                    print(f"  FPS: {current_fps:.1f} (measured)")
                 fps_counter = 0
-                last_fps_time = time.time()
+                last_fps_time = now
 
-            # Add FPS overlay
+            # Add FPS overlay, re-rendering the text only every few frames
             if show_fps:
-                cv2.putText(
-                    frame,
-                    f"FPS: {current_fps:.1f}",
-                    (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    1,
-                    (0, 255, 0),
-                    2
-                )
-                cv2.putText(
-                    frame,
-                    f"Frame: {frame_count}",
-                    (10, 70),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    1,
-                    (0, 255, 0),
-                    2
-                )
+                if hud is None or frame_count % HUD_REFRESH == 1:
+                    hud = render_hud([
+                        HUD_FPS_FORMAT % current_fps,
+                        HUD_FRAME_FORMAT % frame_count
+                    ], HUD_SIZE)
+                    if use_opencl:
+                        hud = upload_hud(hud)
+
+                if use_opencl:
+                    frame = blit_hud_umat(frame, hud)
+                else:
+                    blit_hud(frame, hud)
 
             # Display frame
-            cv2.imshow(f'Stream: {stream_url}', frame)
+            imshow(window_name, frame)
 
             # Handle key press
-            key = cv2.waitKey(1) & 0xFF
+            key = waitKey(1) & 0xFF
             if key == ord('q'):
                 print("\n✓ User quit")
                 break
@@ -112,7 +195,7 @@ def test_single_stream(stream_url, duration=None, show_fps=True):
         print("\n✓ Interrupted by user")
 
     finally:
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
 
         # Print statistics
         print(f"\n{'='*60}")
@@ -141,59 +224,77 @@ def test_multiple_streams(stream_urls, duration=None):
     print(f"Testing {len(stream_urls)} Streams Simultaneously")
     print(f"{'='*60}\n")
 
-    captures = []
+    if HAS_GSTREAMER:
+        result = _test_multiple_streams_gst(stream_urls, duration)
+        if result is not None:
+            return result
+
+    # Per-stream state kept as parallel lists indexed by stream
+    caps = []
+    urls = []
+    frame_counts = []
 
-    # Open all streams
-    for i, url in enumerate(stream_urls, 1):
-        cap = cv2.VideoCapture(url)
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
+    # Open all streams concurrently so the RTSP handshakes overlap
+    with ThreadPoolExecutor(max_workers=len(stream_urls)) as pool:
+        opened = list(pool.map(open_capture, stream_urls))
 
+    for i, (url, cap) in enumerate(zip(stream_urls, opened), 1):
         if not cap.isOpened():
             print(f"❌ ERROR: Could not open stream {i}: {url}")
             continue
 
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        print(f"✓ Stream {i} opened: {url} ({width}x{height})")
+        print(f"✓ Stream {i} opened: {url}")
 
-        captures.append({
-            'cap': cap,
-            'url': url,
-            'frame_count': 0
-        })
+        caps.append(cap)
+        urls.append(url)
+        frame_counts.append(0)
 
-    if not captures:
+    if not caps:
         print("\n❌ No streams could be opened")
         return False
 
     print(f"\nPress 'q' to quit\n")
 
-    start_time = time.time()
+    labels = [f"Stream {i}" for i in range(1, len(caps) + 1)]
+    window_names = [f'{label}: {url}' for label, url in zip(labels, urls)]
+
+    start_time = time.monotonic()
 
     try:
         while True:
             # Check duration limit
-            if duration and (time.time() - start_time) >= duration:
+            if duration and (time.monotonic() - start_time) >= duration:
                 print(f"\n✓ Duration limit reached ({duration}s)")
                 break
 
             all_ok = True
 
-            # Read and display frames from all streams
-            for i, stream in enumerate(captures, 1):
-                ret, frame = stream['cap'].read()
+            # Grab from all streams first so network waits overlap
+            grabbed = [cap.grab() for cap in caps]
+
+            # Then decode and display frames from all streams
+            for i, cap in enumerate(caps):
+                if not grabbed[i]:
+                    print(f"\n❌ {labels[i]} failed to grab frame")
+                    all_ok = False
+                    continue
+
+                ret, frame = cap.retrieve()
 
                 if not ret:
-                    print(f"\n❌ Stream {i} failed to grab frame")
+                    print(f"\n❌ {labels[i]} failed to decode frame")
                     all_ok = False
                     continue
 
-                stream['frame_count'] += 1
+                frame_counts[i] += 1
+
+                if frame_counts[i] == 1:
+                    print(f"  {labels[i]} resolution: {frame.shape[1]}x{frame.shape[0]}")
 
                 # Add stream label
                 cv2.putText(
                     frame,
-                    f"Stream {i}",
+                    labels[i],
                     (10, 30),
                     cv2.FONT_HERSHEY_SIMPLEX,
                     1,
@@ -201,7 +302,7 @@ def test_multiple_streams(stream_urls, duration=None):
                     2
                 )
 
-                cv2.imshow(f'Stream {i}: {stream["url"]}', frame)
+                cv2.imshow(window_names[i], frame)
 
             if not all_ok:
                 break
@@ -215,29 +316,167 @@ def test_multiple_streams(stream_urls, duration=None):
         print("\n✓ Interrupted by user")
 
     finally:
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
 
-        # Print statistics
-        print(f"\n{'='*60}")
-        print(f"STATISTICS")
-        print(f"{'='*60}")
-        for i, stream in enumerate(captures, 1):
-            avg_fps = stream['frame_count'] / elapsed if elapsed > 0 else 0
-            print(f"Stream {i}:")
-            print(f"  URL: {stream['url']}")
-            print(f"  Frames: {stream['frame_count']}")
-            print(f"  Avg FPS: {avg_fps:.2f}")
-        print(f"Duration: {elapsed:.2f}s")
-        print(f"{'='*60}\n")
+        _print_multi_stream_stats(urls, frame_counts, elapsed)
 
         # Cleanup
-        for stream in captures:
-            stream['cap'].release()
+        for cap in caps:
+            cap.release()
         cv2.destroyAllWindows()
 
     return True
 
 
+# One appsink per stream keeping only the newest decoded BGR frame
+GST_PIPELINE = (
+    "rtspsrc location={url} latency=0 ! rtph264depay ! avdec_h264 ! videoconvert ! "
+    "video/x-raw,format=BGR ! "
+    "appsink name=sink emit-signals=true max-buffers=1 drop=true sync=false"
+)
+GST_DISPLAY_INTERVAL_MS = 10
+
+
+def _test_multiple_streams_gst(stream_urls, duration=None):
+    """
+    Consume multiple RTSP streams through GStreamer appsinks
+
+    Frames arrive through per-stream callbacks, so a stalled stream never
+    blocks the others. Display runs on the GLib main loop.
+
+    Returns:
+        None if the pipelines cannot be built (e.g. a plugin is missing),
+        so the caller can fall back to the OpenCV loop
+    """
+    Gst.init(None)
+
+    urls = list(stream_urls)
+    labels = [f"Stream {i}" for i in range(1, len(urls) + 1)]
+    window_names = [f'{label}: {url}' for label, url in zip(labels, urls)]
+    frame_counts = [0] * len(urls)
+    printed = [False] * len(urls)
+    latest = [None] * len(urls)
+    lock = Lock()
+    pipelines = []
+    loop = GLib.MainLoop()
+
+    def on_new_sample(sink, index):
+        sample = sink.emit('pull-sample')
+        buffer = sample.get_buffer()
+        structure = sample.get_caps().get_structure(0)
+        width = structure.get_value('width')
+        height = structure.get_value('height')
+
+        ok, info = buffer.map(Gst.MapFlags.READ)
+        if not ok:
+            return Gst.FlowReturn.ERROR
+        try:
+            # Rows may be padded, so slice each row down to width * 3 bytes
+            rows = np.ndarray((height, info.size // height), np.uint8, info.data)
+            frame = rows[:, :width * 3].reshape(height, width, 3).copy()
+        finally:
+            buffer.unmap(info)
+
+        with lock:
+            latest[index] = frame
+            frame_counts[index] += 1
+        return Gst.FlowReturn.OK
+
+    def on_message(bus, message, index):
+        if message.type == Gst.MessageType.ERROR:
+            error, _ = message.parse_error()
+            print(f"\n❌ {labels[index]} failed: {error.message}")
+            loop.quit()
+        elif message.type == Gst.MessageType.EOS:
+            print(f"\n❌ {labels[index]} ended")
+            loop.quit()
+
+    def on_display():
+        if duration and (time.monotonic() - start_time) >= duration:
+            print(f"\n✓ Duration limit reached ({duration}s)")
+            loop.quit()
+            return False
+
+        with lock:
+            frames = latest[:]
+            latest[:] = [None] * len(latest)
+
+        for i, frame in enumerate(frames):
+            if frame is None:
+                continue
+            if not printed[i]:
+                printed[i] = True
+                print(f"  {labels[i]} resolution: {frame.shape[1]}x{frame.shape[0]}")
+
+            # Add stream label
+            cv2.putText(frame, labels[i], (10, 30), HUD_FONT, 1, HUD_COLOR, 2)
+            cv2.imshow(window_names[i], frame)
+
+        # Handle key press
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            print("\n✓ User quit")
+            loop.quit()
+            return False
+        return True
+
+    # Build every pipeline before starting any, so a missing plugin
+    # falls back cleanly instead of leaving some streams running
+    try:
+        for url in urls:
+            pipelines.append(Gst.parse_launch(GST_PIPELINE.format(url=url)))
+    except GLib.Error as e:
+        print(f"⚠ GStreamer pipeline unavailable ({e.message}), using OpenCV")
+        return None
+
+    for i, (url, pipeline) in enumerate(zip(urls, pipelines)):
+        pipeline.get_by_name('sink').connect('new-sample', on_new_sample, i)
+
+        bus = pipeline.get_bus()
+        bus.add_signal_watch()
+        bus.connect('message', on_message, i)
+
+        pipeline.set_state(Gst.State.PLAYING)
+        print(f"✓ Stream {i + 1} started: {url}")
+
+    print(f"\nPress 'q' to quit\n")
+
+    start_time = time.monotonic()
+    GLib.timeout_add(GST_DISPLAY_INTERVAL_MS, on_display)
+
+    try:
+        loop.run()
+
+    except KeyboardInterrupt:
+        print("\n✓ Interrupted by user")
+
+    finally:
+        elapsed = time.monotonic() - start_time
+
+        _print_multi_stream_stats(urls, frame_counts, elapsed)
+
+        # Cleanup
+        for pipeline in pipelines:
+            pipeline.set_state(Gst.State.NULL)
+        cv2.destroyAllWindows()
+
+    return True
+
+
+def _print_multi_stream_stats(urls, frame_counts, elapsed):
+    """Print per-stream statistics for a multi-stream test"""
+    print(f"\n{'='*60}")
+    print(f"STATISTICS")
+    print(f"{'='*60}")
+    for i, (url, count) in enumerate(zip(urls, frame_counts), 1):
+        avg_fps = count / elapsed if elapsed > 0 else 0
+        print(f"Stream {i}:")
+        print(f"  URL: {url}")
+        print(f"  Frames: {count}")
+        print(f"  Avg FPS: {avg_fps:.2f}")
+    print(f"Duration: {elapsed:.2f}s")
+    print(f"{'='*60}\n")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Test RTSP stream consumption",
@@ -281,6 +520,17 @@ Examples:
         action='store_true',
         help='Disable FPS counter overlay'
     )
+    parser.add_argument(
+        '--low-latency',
+        action='store_true',
+        help='Skip buffered frames to always show the newest one'
+    )
+    parser.add_argument(
+        '--accel',
+        choices=['none', 'opencl'],
+        default='none',
+        help='Draw the overlay with OpenCL (falls back to CPU if unavailable)'
+    )
     parser.add_argument(
         '--host',
         default='localhost',
@@ -315,7 +565,9 @@ Examples:
         success = test_single_stream(
             stream_urls[0],
             duration=args.duration,
-            show_fps=not args.no_fps
+            show_fps=not args.no_fps,
+            low_latency=args.low_latency,
+            accel=args.accel
         )
     else:
         success = test_multiple_streams(
@@ -8,6 +8,8 @@ import os
 import sys
 import subprocess
 import platform
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from loguru import logger
 
@@ -34,19 +36,14 @@ class SetupManager:
         """Check if FFmpeg is installed"""
         logger.info("Checking for FFmpeg...")
         
-        try:
-            result = subprocess.run(
-                ["ffmpeg", "-version"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True
-            )
+        # A PATH lookup is enough; no need to spawn ffmpeg itself
+        if shutil.which("ffmpeg") is not None:
             logger.info("✓ FFmpeg is installed")
             return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            logger.error("✗ FFmpeg is not installed")
-            self._print_ffmpeg_install_instructions()
-            return False
+        
+        logger.error("✗ FFmpeg is not installed")
+        self._print_ffmpeg_install_instructions()
+        return False
     
     def _print_ffmpeg_install_instructions(self):
         """Print FFmpeg installation instructions"""
@@ -114,14 +111,16 @@ class SetupManager:
             Path("../mediamtx.exe"),
         ]
         
-        found = False
-        for location in locations:
-            if location.exists():
-                logger.info(f"✓ Found MediaMTX at: {location}")
-                found = True
-                break
-        
+        found = shutil.which("mediamtx")
         if not found:
+            for location in locations:
+                if location.exists():
+                    found = location
+                    break
+        
+        if found:
+            logger.info(f"✓ Found MediaMTX at: {found}")
+        else:
             logger.warning("✗ MediaMTX not found in common locations")
             self._print_mediamtx_instructions()
         
@@ -153,9 +152,11 @@ class SetupManager:
         
         if response in ['yes', 'y']:
             try:
-                from video_generator import DummyVideoGenerator
+                sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+                from rtsp_load_tester.video_generator import DummyVideoGenerator
                 generator = DummyVideoGenerator()
-                generator.generate_all_test_videos()
+                # Encoding is CPU-bound, so spread the videos across processes
+                generator.generate_all_test_videos(max_workers=os.cpu_count())
                 logger.info("✓ Test videos generated")
                 return True
             except Exception as e:
@@ -181,18 +182,41 @@ class SetupManager:
             ("Test Videos", self.generate_test_videos),
         ]
         
-        results = []
+        # Independent IO-bound checks run concurrently; the rest are
+        # interactive or depend on installed packages and stay sequential
+        parallel_steps = {"Python Version", "FFmpeg", "Directories", "MediaMTX"}
+        
+        step_results = {}
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                executor.submit(step_func): step_name
+                for step_name, step_func in steps
+                if step_name in parallel_steps
+            }
+            for future in as_completed(futures):
+                step_name = futures[future]
+                try:
+                    step_results[step_name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error in {step_name}: {e}")
+                    step_results[step_name] = False
+        logger.info("")
         
         for step_name, step_func in steps:
+            if step_name in parallel_steps:
+                continue
             try:
-                result = step_func()
-                results.append((step_name, result))
+                step_results[step_name] = step_func()
                 logger.info("")
             except Exception as e:
                 logger.error(f"Error in {step_name}: {e}")
-                results.append((step_name, False))
+                step_results[step_name] = False
                 logger.info("")
         
+        # Keep the summary in the original step order
+        results = [(step_name, step_results[step_name]) for step_name, _ in steps]
+        
         # Print summary
         logger.info("=" * 60)
         logger.info("Setup Summary")
@@ -106,7 +106,7 @@ echo "Would you like to generate test videos? (yes/no)"
 read -r response
 if [[ "$response" =~ ^([yY][eE][sS]|[yY])$ ]]; then
     echo "Generating test videos..."
-    $PYTHON_CMD video_generator.py
+    PYTHONPATH=src $PYTHON_CMD -m rtsp_load_tester.video_generator
     echo -e "${GREEN}✓${NC} Test videos generated"
 fi
 
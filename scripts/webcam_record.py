@@ -1,10 +1,21 @@
 #!/usr/bin/env python3
 import argparse
+import os
+import queue
+import threading
 import time
 from pathlib import Path
 
 import cv2
 
+# Prefer hardware H.264 (NVENC) with threaded encode through the FFmpeg backend
+FFMPEG_WRITER_OPTIONS = (
+    "video_codec;h264_nvenc|threads;auto|thread_type;frame|preset;p1|tune;ll"
+)
+
+# Frames buffered between capture and encode before capture waits on the encoder
+WRITE_QUEUE_SIZE = 8
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -34,9 +45,43 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional output filename (default: auto timestamp).",
     )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="Show a live preview window (press q to stop early).",
+    )
     return parser.parse_args()
 
 
+def open_writer(output_path: Path, fps: float, size: tuple) -> cv2.VideoWriter:
+    """Open an H.264 writer, falling back to software mp4v if unavailable."""
+    os.environ["OPENCV_FFMPEG_WRITER_OPTIONS"] = FFMPEG_WRITER_OPTIONS
+    writer = cv2.VideoWriter(
+        str(output_path), cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*"avc1"), fps, size
+    )
+    if writer.isOpened():
+        return writer
+
+    print("Hardware H.264 encoder unavailable, falling back to mp4v")
+    os.environ.pop("OPENCV_FFMPEG_WRITER_OPTIONS", None)
+    return cv2.VideoWriter(str(output_path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+
+
+def write_frames(writer: cv2.VideoWriter, frames: queue.Queue, errors: list) -> None:
+    """Encode queued frames until a None sentinel is received.
+
+    A failed write is recorded in errors; later frames are drained unwritten
+    so the capture loop never blocks on a full queue.
+    """
+    for frame in iter(frames.get, None):
+        if errors:
+            continue
+        try:
+            writer.write(frame)
+        except Exception as e:
+            errors.append(e)
+
+
 def main() -> int:
     args = parse_args()
 
@@ -63,31 +108,46 @@ def main() -> int:
 
     output_path = args.output_dir / filename
 
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    writer = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
+    writer = open_writer(output_path, fps, (width, height))
 
-    frame_interval = 1.0 / fps
-    start_time = time.time()
-    next_frame_time = time.time()
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        cv2.imshow("Webcam Preview", frame)
-        now = time.time()
-        if now >= next_frame_time:
-            writer.write(frame)
-            next_frame_time += frame_interval
+    # Encode on a separate thread so it overlaps with the next capture
+    frames = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    write_errors = []
+    write_thread = threading.Thread(target=write_frames, args=(writer, frames, write_errors))
+    write_thread.start()
 
-        if time.time() - start_time >= args.duration_seconds:
-            break
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
-
-    cap.release()
-    writer.release()
-    cv2.destroyAllWindows()
+    frame_interval = 1.0 / fps
+    start_time = time.monotonic()
+    next_frame_time = start_time
+
+    # Always stop the writer thread and finalize the file, even on Ctrl+C
+    # or a capture error, so the MP4 gets its index and the process can exit
+    try:
+        while not write_errors:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if args.preview:
+                cv2.imshow("Webcam Preview", frame)
+            now = time.monotonic()
+            if now >= next_frame_time:
+                frames.put(frame)
+                next_frame_time += frame_interval
+
+            if now - start_time >= args.duration_seconds:
+                break
+            if args.preview and cv2.waitKey(1) & 0xFF == ord("q"):
+                break
+    finally:
+        cap.release()
+        frames.put(None)
+        write_thread.join()
+        writer.release()
+        if args.preview:
+            cv2.destroyAllWindows()
+
+    if write_errors:
+        raise RuntimeError(f"Failed to write {output_path}") from write_errors[0]
 
     print(f"Saved recording to: {output_path}")
     return 0
@@ -8,6 +8,6 @@ Publishes multiple looping video streams simultaneously to test parallel process
 __version__ = "0.1.0"
 
 from .orchestrator import LoadTestOrchestrator
-from .stream_publisher import RTSPStreamPublisher
+from .stream_publisher import RTSPStreamPublisher, RTSPFanoutPublisher
 
-__all__ = ["LoadTestOrchestrator", "RTSPStreamPublisher"]
+__all__ = ["LoadTestOrchestrator", "RTSPStreamPublisher", "RTSPFanoutPublisher"]
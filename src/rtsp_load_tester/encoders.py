@@ -0,0 +1,81 @@
+"""
+Hardware Encoder Detection
+Picks an FFmpeg H.264 encoder shared by the stream publishers and the video generator
+"""
+
+import subprocess
+from functools import lru_cache
+from loguru import logger
+
+
+# Hardware H.264 encoders and their low-latency options, in auto-detect order
+HW_ENCODERS = {
+    "nvenc": ("h264_nvenc", ["-preset", "p1", "-tune", "ll", "-rc", "cbr"]),
+    "qsv": ("h264_qsv", ["-preset", "veryfast", "-pix_fmt", "nv12"]),
+    "vaapi": ("h264_vaapi", ["-vf", "format=nv12,hwupload"]),
+    "videotoolbox": ("h264_videotoolbox", ["-realtime", "1", "-pix_fmt", "nv12"]),
+}
+VAAPI_DEVICE = "/dev/dri/renderD128"
+
+
+def hwaccel_global_opts(accel: str) -> list:
+    """FFmpeg options that must precede the input for a hardware encoder"""
+    return ["-vaapi_device", VAAPI_DEVICE] if accel == "vaapi" else []
+
+
+@lru_cache(maxsize=None)
+def hw_encoder_works(accel: str) -> bool:
+    """Check that a hardware encoder is built into FFmpeg and usable on this machine"""
+    encoder = HW_ENCODERS[accel][0]
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True
+        )
+    except FileNotFoundError:
+        return False
+    if encoder not in result.stdout:
+        return False
+    
+    # Listed encoders may still lack a device/driver, so try a one-frame encode
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+        + hwaccel_global_opts(accel)
+        + ["-f", "lavfi", "-i", "color=size=256x256", "-frames:v", "1", "-c:v", encoder]
+        + HW_ENCODERS[accel][1]
+        + ["-f", "null", "-"],
+        capture_output=True
+    )
+    return result.returncode == 0
+
+
+def resolve_accel(accel: str, probe: bool = True) -> str:
+    """
+    Resolve a configured accel mode to a usable hardware encoder
+    
+    Args:
+        accel: "auto", "none" or one of HW_ENCODERS
+        probe: Check that a named hardware encoder actually works; pass False
+            for a value that was already resolved (e.g. in another process)
+        
+    Returns:
+        Name of a working hardware encoder, or "none" for software encoding
+    """
+    if accel == "auto":
+        for name in HW_ENCODERS:
+            if hw_encoder_works(name):
+                logger.info(f"Using hardware encoder: {HW_ENCODERS[name][0]}")
+                return name
+        logger.info("No hardware encoder available, using software encoding")
+        return "none"
+    
+    if accel in HW_ENCODERS and probe and not hw_encoder_works(accel):
+        logger.warning(f"Hardware encoder '{accel}' is not available, using software encoding")
+        return "none"
+    
+    if accel != "none" and accel not in HW_ENCODERS:
+        logger.warning(f"Unknown accel mode '{accel}', using software encoding")
+        return "none"
+    
+    return accel
@@ -3,6 +3,9 @@ RTSP Load Tester - Main Entry Point
 """
 
 import argparse
+import hashlib
+import os
+import pickle
 import yaml
 import sys
 from pathlib import Path
@@ -10,26 +13,76 @@ from loguru import logger
 
 from .orchestrator import LoadTestOrchestrator
 
-# Optional import for video generation (not needed in Docker)
+# Prefer the LibYAML-backed parser; the pure-Python loader is much slower
 try:
-    from .video_generator import DummyVideoGenerator
-    HAS_VIDEO_GENERATOR = True
+    from yaml import CSafeLoader as YAMLLoader
 except ImportError:
-    HAS_VIDEO_GENERATOR = False
+    from yaml import SafeLoader as YAMLLoader
+
+if not yaml.__with_libyaml__:
+    logger.warning(
+        "PyYAML was built without LibYAML; config parsing falls back to the "
+        "slow pure-Python loader (install libyaml-dev and reinstall PyYAML)"
+    )
+
+
+# Parsed configs are cached per user, keyed only on the YAML content
+CONFIG_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "rtsp_load_tester"
+CONFIG_CACHE_MAX_ENTRIES = 8  # Older parses are pruned whenever a new one is written
+
+
+def _config_cache_path(raw: bytes) -> Path:
+    """Return the cache path for a config, keyed on a hash of its content"""
+    key = hashlib.blake2b(raw, digest_size=8).hexdigest()
+    return CONFIG_CACHE_DIR / f"{key}.pkl"
+
+
+def _prune_config_cache():
+    """Remove all but the most recently written cached configs"""
+    entries = sorted(
+        CONFIG_CACHE_DIR.glob("*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    for stale in entries[CONFIG_CACHE_MAX_ENTRIES:]:
+        stale.unlink(missing_ok=True)
 
 
 def load_config(config_path: str) -> dict:
-    """Load configuration from YAML file"""
+    """Load configuration from YAML file, reusing a pickled parse of identical content"""
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        return config
+        with open(config_path, 'rb') as f:
+            raw = f.read()
     except FileNotFoundError:
         logger.error(f"Configuration file not found: {config_path}")
         sys.exit(1)
+    
+    # Content-addressed, so touched or re-deployed files with the same bytes still hit
+    cache_path = _config_cache_path(raw)
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        pass  # Best effort: a missing, corrupt or incompatible cache just means re-parsing
+    
+    try:
+        config = yaml.load(raw, Loader=YAMLLoader)
     except yaml.YAMLError as e:
         logger.error(f"Error parsing configuration file: {e}")
         sys.exit(1)
+    
+    # Write to a temp file and rename so readers never see a partial cache
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        CONFIG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(config, f, protocol=5)
+        os.replace(tmp_path, cache_path)
+        _prune_config_cache()
+    except OSError as e:
+        logger.debug(f"Could not write config cache {cache_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    return config
 
 
 def validate_setup():
@@ -168,7 +221,10 @@ def main():
     
     # Generate videos if requested (for backward compatibility)
     if args.generate_videos:
-        if not HAS_VIDEO_GENERATOR:
+        # Imported lazily so normal runs never load OpenCV (not needed in Docker)
+        try:
+            from .video_generator import DummyVideoGenerator
+        except ImportError:
             logger.error("video_generator module not available")
             logger.error("Please use this feature outside of Docker")
             sys.exit(1)
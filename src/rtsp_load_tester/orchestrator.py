@@ -7,12 +7,47 @@ import time
 import signal
 import sys
 import json
+from array import array
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from pathlib import Path
 from loguru import logger
 import psutil
 
-from .stream_publisher import RTSPStreamPublisher
+from .encoders import resolve_accel
+from .reactor import get_reactor
+from .stream_publisher import (
+    RTSPStreamPublisher,
+    RTSPFanoutPublisher,
+    RestartBreaker,
+    MAX_ERRORS,
+)
+
+# Optional faster JSON encoder for reports
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Byte size of a gigabyte and prebuilt report line templates
+_GB = 1 << 30
+_MEMORY_TMPL = "System Memory: {:.1f}% ({:.2f}GB / {:.2f}GB)"
+_STREAM_STATUS_TMPL = "  {} {}: Uptime={:.0f}s, Errors={}, Resolution={}"
+
+# Pause all restarts when this share of publishers is down at once
+BREAKER_DOWN_RATIO = 0.8
+BREAKER_PAUSE_SECONDS = 60
+
+
+def _dump_json(obj: Any, f):
+    """Write obj as indented JSON to a binary file, using orjson when available"""
+    if HAS_ORJSON:
+        f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        f.write(json.dumps(obj, indent=2).encode())
 
 
 class LoadTestOrchestrator:
@@ -27,6 +62,13 @@ class LoadTestOrchestrator:
         """
         self.config = config
         self.publishers: List[RTSPStreamPublisher] = []
+        
+        # Per-publisher state as parallel arrays, filled by create_publishers
+        self._pub_names: List[str] = []
+        self._pub_sinks: List[int] = []
+        self._pub_running = bytearray()
+        self._pub_errors = array("i")
+        self._restart_breaker = RestartBreaker()
         self.running = False
         self.start_time: float = 0
         
@@ -34,6 +76,10 @@ class LoadTestOrchestrator:
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
+        # FFmpeg exits wake the process reactor via SIGCHLD; a no-op where
+        # pidfd works, so the handler is only installed on the fallback path
+        get_reactor().enable_sigchld()
+        
         # Setup logging
         self._setup_logging()
         
@@ -47,18 +93,21 @@ class LoadTestOrchestrator:
         # Create logs directory
         Path("logs").mkdir(exist_ok=True)
         
-        # Configure loguru
+        # Configure loguru; enqueue hands writes to a background thread so the
+        # monitoring loop and reactor never block on log I/O
         logger.remove()  # Remove default handler
         logger.add(
             sys.stderr,
             level=log_level,
-            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>"
+            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
+            enqueue=True
         )
         logger.add(
             "logs/rtsp_load_test_{time}.log",
             rotation="100 MB",
             retention="7 days",
-            level=log_level
+            level=log_level,
+            enqueue=True
         )
     
     def _validate_config(self):
@@ -89,6 +138,7 @@ class LoadTestOrchestrator:
         """Create stream publishers based on configuration"""
         rtsp_base_url = self.config["rtsp_server"]["base_url"]
         publisher_config = self.config.get("publisher", {})
+        accel = resolve_accel(publisher_config.get("accel", "none"))
 
         # Check if using new config format (single video for all streams)
         if self.config.get("video"):
@@ -100,34 +150,66 @@ class LoadTestOrchestrator:
             # Get number of concurrent streams
             concurrent_streams = self.config.get("load_test", {}).get("concurrent_streams", 3)
 
-            # Create multiple publishers from the same video
-            for i in range(1, concurrent_streams + 1):
-                stream_name = f"stream{i}"
-                rtsp_url = f"{rtsp_base_url}/{stream_name}"
+            # Opt-in: encode once and fan out to every stream via FFmpeg's tee
+            # muxer, which no longer exercises N independent encoders
+            if concurrent_streams > 1 and publisher_config.get("fanout", False):
+                threads, cpu_affinity = self._encoder_placement(0, 1)
+                stream_names = [f"stream{i}" for i in range(1, concurrent_streams + 1)]
 
-                publisher = RTSPStreamPublisher(
-                    stream_name=stream_name,
+                publisher = RTSPFanoutPublisher(
+                    stream_names=stream_names,
                     video_path=video_path,
-                    rtsp_url=rtsp_url,
+                    rtsp_urls=[f"{rtsp_base_url}/{name}" for name in stream_names],
                     loop=loop,
                     fps=fps,
                     codec=publisher_config.get("codec", "libx264"),
                     preset=publisher_config.get("preset", "ultrafast"),
                     bitrate=publisher_config.get("bitrate", "2M"),
-                    pixel_format=publisher_config.get("pixel_format", "yuv420p")
+                    pixel_format=publisher_config.get("pixel_format", "yuv420p"),
+                    force_reencode=publisher_config.get("force_reencode", False),
+                    accel=accel,
+                    threads=threads,
+                    cpu_affinity=cpu_affinity
                 )
 
                 self.publishers.append(publisher)
-                logger.info(f"Created publisher for stream: {stream_name}")
+                logger.info(f"Created fan-out publisher for {concurrent_streams} streams")
+
+            # Create multiple publishers from the same video
+            else:
+                for i in range(1, concurrent_streams + 1):
+                    stream_name = f"stream{i}"
+                    rtsp_url = f"{rtsp_base_url}/{stream_name}"
+                    threads, cpu_affinity = self._encoder_placement(i - 1, concurrent_streams)
+
+                    publisher = RTSPStreamPublisher(
+                        stream_name=stream_name,
+                        video_path=video_path,
+                        rtsp_url=rtsp_url,
+                        loop=loop,
+                        fps=fps,
+                        codec=publisher_config.get("codec", "libx264"),
+                        preset=publisher_config.get("preset", "ultrafast"),
+                        bitrate=publisher_config.get("bitrate", "2M"),
+                        pixel_format=publisher_config.get("pixel_format", "yuv420p"),
+                        force_reencode=publisher_config.get("force_reencode", False),
+                        accel=accel,
+                        threads=threads,
+                        cpu_affinity=cpu_affinity
+                    )
+
+                    self.publishers.append(publisher)
+                    logger.info(f"Created publisher for stream: {stream_name}")
 
         # Support old config format (video_sources array)
         elif self.config.get("video_sources"):
             video_sources = self.config["video_sources"]
 
-            for source in video_sources:
+            for i, source in enumerate(video_sources):
                 stream_name = source["name"]
                 video_path = source["video_path"]
                 rtsp_url = f"{rtsp_base_url}/{stream_name}"
+                threads, cpu_affinity = self._encoder_placement(i, len(video_sources))
 
                 # Create publisher
                 publisher = RTSPStreamPublisher(
@@ -139,14 +221,56 @@ class LoadTestOrchestrator:
                     codec=publisher_config.get("codec", "libx264"),
                     preset=publisher_config.get("preset", "ultrafast"),
                     bitrate=publisher_config.get("bitrate", "2M"),
-                    pixel_format=publisher_config.get("pixel_format", "yuv420p")
+                    pixel_format=publisher_config.get("pixel_format", "yuv420p"),
+                    force_reencode=publisher_config.get("force_reencode", False),
+                    accel=accel,
+                    threads=threads,
+                    cpu_affinity=cpu_affinity
                 )
 
                 self.publishers.append(publisher)
                 logger.info(f"Created publisher for stream: {stream_name}")
 
+        self._bind_publisher_state()
+        
         logger.info(f"Created {len(self.publishers)} stream publishers")
     
+    def _bind_publisher_state(self):
+        """Lay out publisher state in parallel arrays shared with the publishers"""
+        count = len(self.publishers)
+        self._pub_names = [p.stream_name for p in self.publishers]
+        self._pub_sinks = [len(p.rtsp_urls) for p in self.publishers]
+        self._pub_running = bytearray(count)
+        self._pub_errors = array("i", [0]) * count
+        
+        for index, publisher in enumerate(self.publishers):
+            publisher.bind_state(self._pub_running, self._pub_errors, index)
+            publisher.restart_breaker = self._restart_breaker
+    
+    def _encoder_placement(self, index: int, process_count: int):
+        """
+        Decide encoder threads and CPU affinity for one FFmpeg process
+        
+        Args:
+            index: Position of the process among all FFmpeg processes
+            process_count: Total number of FFmpeg processes
+            
+        Returns:
+            Tuple of (threads, cpu_affinity); cpu_affinity is None unless pin_cpus is set
+        """
+        publisher_config = self.config.get("publisher", {})
+        cpu_count = os.cpu_count() or 1
+        
+        # Share the cores between encoders instead of every libx264 spawning ncpu threads
+        threads = publisher_config.get("threads") or max(1, cpu_count // process_count)
+        
+        cpu_affinity = None
+        if publisher_config.get("pin_cpus", False):
+            first = index * threads
+            cpu_affinity = {(first + k) % cpu_count for k in range(threads)}
+        
+        return threads, cpu_affinity
+    
     def start(self):
         """Start all stream publishers"""
         if self.running:
@@ -163,19 +287,28 @@ class LoadTestOrchestrator:
         logger.info("Starting RTSP Load Test")
         logger.info("=" * 60)
         
-        # Start all publishers
-        for publisher in self.publishers:
-            try:
-                publisher.start()
-                time.sleep(0.5)  # Small delay between starts
-            except Exception as e:
-                logger.error(f"Failed to start publisher {publisher.stream_name}: {e}")
+        # Start all publishers concurrently, optionally spread over a ramp-up window
+        ramp_up = self.config.get("load_test", {}).get("ramp_up_seconds", 0)
+        delay = ramp_up / len(self.publishers) if self.publishers else 0
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(self.publishers)))) as executor:
+            for publisher in self.publishers:
+                executor.submit(self._start_publisher, publisher)
+                if delay > 0:
+                    time.sleep(delay)
         
-        logger.info(f"Started {len(self.publishers)} streams")
+        logger.info(f"Started {self._stream_count()} streams")
         
         # Start monitoring loop
         self._monitoring_loop()
     
+    def _start_publisher(self, publisher: RTSPStreamPublisher):
+        """Start a single publisher, logging rather than raising on failure"""
+        try:
+            publisher.start()
+        except Exception as e:
+            logger.error(f"Failed to start publisher {publisher.stream_name}: {e}")
+    
     def _monitoring_loop(self):
         """Monitor streams and system resources"""
         report_interval = self.config.get("load_test", {}).get("report_interval", 10)
@@ -183,6 +316,9 @@ class LoadTestOrchestrator:
         
         last_report_time = time.time()
         
+        # Prime the CPU counter; later non-blocking calls report usage since the previous one
+        psutil.cpu_percent(interval=None)
+        
         while self.running:
             try:
                 current_time = time.time()
@@ -193,13 +329,17 @@ class LoadTestOrchestrator:
                     logger.info(f"Test duration reached ({duration}s), stopping...")
                     break
                 
+                # Sample system resources once per tick
+                cpu_percent = psutil.cpu_percent(interval=None)
+                memory = psutil.virtual_memory()
+                
                 # Periodic status report
                 if current_time - last_report_time >= report_interval:
-                    self._print_status_report()
+                    self._print_status_report(cpu_percent, memory)
                     last_report_time = current_time
                 
                 # Check resource limits
-                self._check_resource_limits()
+                self._check_resource_limits(cpu_percent, memory)
                 
                 # Check stream health
                 self._check_stream_health()
@@ -215,43 +355,55 @@ class LoadTestOrchestrator:
         
         self.stop()
     
-    def _print_status_report(self):
-        """Print status report"""
+    def _print_status_report(self, cpu_percent: float, memory):
+        """
+        Print status report
+        
+        Args:
+            cpu_percent: System CPU usage sampled this tick
+            memory: psutil.virtual_memory() result sampled this tick
+        """
         logger.info("=" * 60)
         logger.info("STATUS REPORT")
         logger.info("=" * 60)
         
         # System resources
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        
         logger.info(f"System CPU: {cpu_percent:.1f}%")
-        logger.info(f"System Memory: {memory.percent:.1f}% ({memory.used / 1024**3:.2f}GB / {memory.total / 1024**3:.2f}GB)")
+        logger.info(_MEMORY_TMPL, memory.percent, memory.used / _GB, memory.total / _GB)
         
         # Stream statistics
-        healthy_count = sum(1 for p in self.publishers if p.is_healthy())
-        logger.info(f"Streams: {healthy_count}/{len(self.publishers)} healthy")
+        running, errors = self._pub_running, self._pub_errors
+        healthy_count = sum(
+            sinks for sinks, r, e in zip(self._pub_sinks, running, errors) if r and e < MAX_ERRORS
+        )
+        logger.info(f"Streams: {healthy_count}/{self._stream_count()} healthy")
         
         # Individual stream stats
-        for publisher in self.publishers:
-            stats = publisher.get_stats()
-            status = "✓" if stats["is_alive"] else "✗"
+        for snap in self._iter_stream_snapshots():
             logger.info(
-                f"  {status} {stats['stream_name']}: "
-                f"Uptime={stats['uptime_seconds']:.0f}s, "
-                f"Errors={stats['error_count']}, "
-                f"Resolution={stats['resolution']}"
+                _STREAM_STATUS_TMPL,
+                "✓" if snap.is_alive else "✗",
+                snap.stream_name,
+                snap.uptime_seconds,
+                snap.error_count,
+                snap.resolution
             )
         
         logger.info("=" * 60)
     
-    def _check_resource_limits(self):
-        """Check if resource limits are exceeded"""
+    def _check_resource_limits(self, cpu_percent: float, memory):
+        """
+        Check if resource limits are exceeded
+        
+        Args:
+            cpu_percent: System CPU usage sampled this tick
+            memory: psutil.virtual_memory() result sampled this tick
+        """
         limits = self.config.get("limits", {})
         
         # Memory check
         max_memory = limits.get("max_memory_percent", 80)
-        memory_percent = psutil.virtual_memory().percent
+        memory_percent = memory.percent
         
         if memory_percent > max_memory:
             logger.error(
@@ -262,24 +414,30 @@ class LoadTestOrchestrator:
         
         # CPU check (warning only)
         max_cpu = limits.get("max_cpu_percent", 90)
-        cpu_percent = psutil.cpu_percent(interval=1)
         
         if cpu_percent > max_cpu:
             logger.warning(f"CPU usage ({cpu_percent:.1f}%) exceeds limit ({max_cpu}%)")
     
     def _check_stream_health(self):
-        """Check health of all streams"""
-        unhealthy_streams = [p for p in self.publishers if not p.is_healthy()]
+        """Check health of all streams and trip the restart breaker on mass outages"""
+        running, errors = self._pub_running, self._pub_errors
+        unhealthy_idx = [i for i, (r, e) in enumerate(zip(running, errors)) if not r or e >= MAX_ERRORS]
         
-        if unhealthy_streams:
-            logger.warning(f"Found {len(unhealthy_streams)} unhealthy streams")
-            
-            for publisher in unhealthy_streams:
-                if publisher.error_count >= 10:
-                    logger.error(
-                        f"Stream {publisher.stream_name} has too many errors, stopping it"
-                    )
-                    publisher.stop()
+        if unhealthy_idx:
+            # Publishers stop themselves after MAX_ERRORS failures
+            logger.warning(f"Found {len(unhealthy_idx)} unhealthy streams")
+        
+        # Most FFmpeg processes down at once points at the RTSP server, not the streams
+        active_idx = [i for i, r in enumerate(running) if r]
+        if len(active_idx) < 2 or self._restart_breaker.is_open():
+            return
+        down = sum(1 for i in active_idx if not self.publishers[i].is_alive())
+        if down >= BREAKER_DOWN_RATIO * len(active_idx):
+            logger.error(
+                f"{down}/{len(active_idx)} publishers are down, "
+                f"pausing restarts for {BREAKER_PAUSE_SECONDS}s"
+            )
+            self._restart_breaker.trip(BREAKER_PAUSE_SECONDS)
     
     def stop(self):
         """Stop all stream publishers"""
@@ -307,18 +465,18 @@ class LoadTestOrchestrator:
         
         report = {
             "test_duration_seconds": elapsed,
-            "total_streams": len(self.publishers),
+            "total_streams": self._stream_count(),
             "streams": []
         }
         
         logger.info("=" * 60)
         logger.info("FINAL REPORT")
         logger.info("=" * 60)
-        logger.info(f"Test Duration: {elapsed:.2f}s ({elapsed/60:.2f} minutes)")
-        logger.info(f"Total Streams: {len(self.publishers)}")
+        logger.info("Test Duration: {:.2f}s ({:.2f} minutes)", elapsed, elapsed / 60)
+        logger.info(f"Total Streams: {self._stream_count()}")
         
-        for publisher in self.publishers:
-            stats = publisher.get_stats()
+        for snap in self._iter_stream_snapshots():
+            stats = snap.as_stats()
             report["streams"].append(stats)
             
             logger.info(f"\nStream: {stats['stream_name']}")
@@ -332,8 +490,8 @@ class LoadTestOrchestrator:
             metrics_file = self.config.get("monitoring", {}).get("metrics_file", "logs/metrics.json")
             Path(metrics_file).parent.mkdir(exist_ok=True)
             
-            with open(metrics_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            with open(metrics_file, 'wb') as f:
+                _dump_json(report, f)
             
             logger.info(f"\nReport saved to: {metrics_file}")
         
@@ -341,4 +499,14 @@ class LoadTestOrchestrator:
     
     def get_stream_urls(self) -> List[str]:
         """Get list of all stream URLs"""
-        return [p.rtsp_url for p in self.publishers]
+        return [url for p in self.publishers for url in p.rtsp_urls]
+    
+    def _stream_count(self) -> int:
+        """Count RTSP streams across all publishers"""
+        return sum(len(p.rtsp_urls) for p in self.publishers)
+    
+    def _iter_stream_snapshots(self):
+        """Yield a snapshot of every RTSP stream, expanding fan-out publishers"""
+        now = time.time()
+        for publisher in self.publishers:
+            yield from publisher.sink_snapshots(now)
@@ -0,0 +1,250 @@
+"""
+Process Reactor
+Single event loop that watches FFmpeg child processes and runs delayed callbacks
+"""
+
+import heapq
+import itertools
+import os
+import selectors
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+from loguru import logger
+
+# pidfd_open needs Linux 5.3+ and Python 3.9+
+HAS_PIDFD = hasattr(os, "pidfd_open")
+
+# SIGCHLD lets the reactor learn about exits without pidfd on other POSIX systems
+HAS_SIGCHLD = hasattr(signal, "SIGCHLD")
+
+
+def _pidfd_works() -> bool:
+    """Check that the running kernel supports pidfd_open, not just Python"""
+    if not HAS_PIDFD:
+        return False
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return False
+    return True
+
+# Windows selectors only accept sockets, so pipes need a reader thread there
+HAS_SELECTABLE_PIPES = os.name != "nt"
+
+
+class ProcessReactor:
+    """Dispatches child process exits and timers from one background thread"""
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timers = []
+        self._timer_seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+        # Processes waiting on SIGCHLD wakeups when pidfd is unavailable
+        self._children = []
+        self._sigchld_enabled = False
+
+        # Self-pipe used to wake the select() call from other threads
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+    def watch(self, process: subprocess.Popen, on_exit: Callable[[subprocess.Popen], None]):
+        """
+        Call on_exit(process) from the reactor thread once the process exits
+
+        Args:
+            process: Child process to watch
+            on_exit: Callback invoked with the exited process
+        """
+        pidfd = None
+        if HAS_PIDFD:
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except OSError:
+                pidfd = None  # Kernel without pidfd support
+
+        if pidfd is None and self._sigchld_enabled:
+            # Checked on every SIGCHLD wakeup instead of polled
+            with self._lock:
+                self._children.append((process, on_exit))
+            self._ensure_running()
+            self._wake()  # The child may already have exited
+            return
+
+        if pidfd is None:
+            # Fallback: one waiter thread per process
+            threading.Thread(
+                target=self._wait_in_thread, args=(process, on_exit), daemon=True
+            ).start()
+            return
+
+        def on_ready():
+            self._selector.unregister(pidfd)
+            os.close(pidfd)
+            process.poll()  # Reap the child and record its return code
+            on_exit(process)
+
+        self._register(pidfd, on_ready)
+
+    def enable_sigchld(self):
+        """
+        Wake the reactor on SIGCHLD so exits are seen without pidfd or polling
+
+        Only installed when pidfd is unusable, so the process-wide SIGCHLD
+        disposition is left alone wherever pidfd already covers exits. Must
+        be called from the main thread, which is where Python runs signal
+        handlers.
+        """
+        if not HAS_SIGCHLD or self._sigchld_enabled or _pidfd_works():
+            return
+        signal.signal(signal.SIGCHLD, lambda signum, frame: self._wake())
+        self._sigchld_enabled = True
+
+    def watch_readable(self, pipe, on_readable: Callable[[], bool]):
+        """
+        Call on_readable() from the reactor thread whenever pipe has data
+
+        Args:
+            pipe: File object backed by a pipe; switched to non-blocking mode
+            on_readable: Callback that reads from the pipe and returns False
+                once it reached EOF, after which the pipe is no longer watched
+        """
+        if not HAS_SELECTABLE_PIPES:
+            threading.Thread(
+                target=self._read_in_thread, args=(on_readable,), daemon=True
+            ).start()
+            return
+
+        fd = pipe.fileno()
+        os.set_blocking(fd, False)
+
+        def on_ready():
+            if not on_readable():
+                self._selector.unregister(fd)
+
+        self._register(fd, on_ready)
+
+    def _register(self, fd: int, on_ready: Callable[[], None]):
+        """Queue an fd for registration on the reactor thread"""
+        with self._lock:
+            self._pending.append((fd, on_ready))
+        self._ensure_running()
+        self._wake()
+
+    def call_later(self, delay: float, callback: Callable[[], None]):
+        """Run callback from the reactor thread after delay seconds"""
+        with self._lock:
+            heapq.heappush(self._timers, (time.monotonic() + delay, next(self._timer_seq), callback))
+        self._ensure_running()
+        self._wake()
+
+    def _wait_in_thread(self, process: subprocess.Popen, on_exit):
+        """Block until a process exits when pidfd is unavailable"""
+        process.wait()
+        self._run_callback(on_exit, process)
+
+    def _read_in_thread(self, on_readable):
+        """Read a pipe with blocking reads when it cannot be selected"""
+        while self._run_callback(on_readable):
+            pass
+
+    def _ensure_running(self):
+        """Start the reactor thread on first use"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="process-reactor", daemon=True)
+                self._thread.start()
+
+    def _wake(self):
+        """Interrupt a blocking select() so new work is picked up"""
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass  # Pipe already full, the reactor is awake anyway
+
+    def _run(self):
+        """Reactor loop"""
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                timeout = None
+                if self._timers:
+                    timeout = max(0.0, self._timers[0][0] - time.monotonic())
+
+            for fd, on_ready in pending:
+                self._selector.register(fd, selectors.EVENT_READ, on_ready)
+
+            # SIGCHLD-watched children are only checked after a wakeup
+            woken = False
+            for key, _ in self._selector.select(timeout):
+                if key.fd == self._wake_r:
+                    try:
+                        while os.read(self._wake_r, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    woken = True
+                    continue
+
+                self._run_callback(key.data)
+
+            if woken:
+                # Re-read after select() so children watched during the wait
+                # are checked on this wakeup
+                with self._lock:
+                    children = list(self._children)
+                if children:
+                    self._reap_children(children)
+
+            self._run_due_timers()
+
+    def _reap_children(self, children):
+        """Dispatch exits of SIGCHLD-watched children"""
+        exited = [(process, on_exit) for process, on_exit in children if process.poll() is not None]
+        if not exited:
+            return
+        with self._lock:
+            for child in exited:
+                self._children.remove(child)
+        for process, on_exit in exited:
+            self._run_callback(on_exit, process)
+
+    def _run_due_timers(self):
+        """Run every timer whose deadline has passed"""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._timers or self._timers[0][0] > now:
+                    return
+                _, _, callback = heapq.heappop(self._timers)
+            self._run_callback(callback)
+
+    @staticmethod
+    def _run_callback(callback, *args):
+        """Run a callback, keeping the reactor alive if it raises"""
+        try:
+            return callback(*args)
+        except Exception as e:
+            logger.error(f"Error in reactor callback: {e}")
+            return None
+
+
+_reactor: Optional[ProcessReactor] = None
+_reactor_lock = threading.Lock()
+
+
+def get_reactor() -> ProcessReactor:
+    """Return the process-wide reactor, creating it on first use"""
+    global _reactor
+    with _reactor_lock:
+        if _reactor is None:
+            _reactor = ProcessReactor()
+        return _reactor
@@ -3,13 +3,101 @@ RTSP Stream Publisher
 Handles publishing video files to RTSP streams using FFmpeg
 """
 
+import json
+import random
+from array import array
+import shlex
+from collections import deque
 import subprocess
-import threading
 import time
 import os
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Set, NamedTuple
 from loguru import logger
-import cv2
+
+from .encoders import HW_ENCODERS, hwaccel_global_opts
+from .reactor import get_reactor
+
+
+# Lines of FFmpeg stderr kept per stream for error reports
+STDERR_TAIL_LINES = 64
+
+# FFmpeg restart policy: exponential backoff with jitter, reset after a clean run
+MAX_ERRORS = 10
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 30.0
+CLEAN_RUN_SECONDS = 30.0
+
+
+class RestartBreaker:
+    """Circuit breaker shared by publishers to pause restarts during widespread outages"""
+    
+    def __init__(self):
+        self._open_until = 0.0
+    
+    def trip(self, seconds: float):
+        """Hold back all restarts for the given number of seconds"""
+        self._open_until = time.monotonic() + seconds
+    
+    def is_open(self) -> bool:
+        """Check whether restarts are currently paused"""
+        return time.monotonic() < self._open_until
+    
+    def remaining(self) -> float:
+        """Seconds until restarts are allowed again"""
+        return max(0.0, self._open_until - time.monotonic())
+
+
+@lru_cache(maxsize=32)
+def _probe_video(video_path: str) -> tuple:
+    """Read (width, height, fps, total_frames, codec_name, pix_fmt) of a video file via ffprobe"""
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height,r_frame_rate,nb_frames,codec_name,pix_fmt",
+            "-of", "json",
+            video_path
+        ],
+        capture_output=True,
+        text=True
+    )
+    streams = json.loads(result.stdout or "{}").get("streams") if result.returncode == 0 else None
+    if not streams:
+        raise ValueError(f"Cannot open video file: {video_path}")
+    
+    stream = streams[0]
+    width = int(stream.get("width", 0))
+    height = int(stream.get("height", 0))
+    
+    # r_frame_rate is a fraction such as "30000/1001"
+    num, _, den = stream.get("r_frame_rate", "0/1").partition("/")
+    den = float(den or 1)
+    fps = float(num) / den if den else 0.0
+    
+    # Some containers do not store a frame count ("N/A" or missing)
+    nb_frames = stream.get("nb_frames", "0")
+    total_frames = int(nb_frames) if nb_frames.isdigit() else 0
+    
+    return width, height, fps, total_frames, stream.get("codec_name"), stream.get("pix_fmt")
+
+
+class StreamSnapshot(NamedTuple):
+    """Point-in-time view of one RTSP stream, taken in a single pass"""
+    stream_name: str
+    rtsp_url: str
+    running: bool
+    uptime_seconds: float
+    error_count: int
+    video_path: str
+    resolution: str
+    fps: int
+    is_alive: bool
+    
+    def as_stats(self) -> Dict[str, Any]:
+        """Return the snapshot in the get_stats() dictionary format"""
+        return self._asdict()
 
 
 class RTSPStreamPublisher:
@@ -25,7 +113,11 @@ class RTSPStreamPublisher:
         codec: str = "libx264",
         preset: str = "ultrafast",
         bitrate: str = "2M",
-        pixel_format: str = "yuv420p"
+        pixel_format: str = "yuv420p",
+        force_reencode: bool = False,
+        accel: str = "none",
+        threads: int = 0,
+        cpu_affinity: Optional[Set[int]] = None
     ):
         """
         Initialize RTSP stream publisher
@@ -40,19 +132,38 @@ class RTSPStreamPublisher:
             preset: Encoding preset
             bitrate: Video bitrate
             pixel_format: Pixel format
+            force_reencode: Always re-encode, even if the source could be stream-copied
+            accel: Hardware encoder to use for H.264 ("none" or a key of HW_ENCODERS)
+            threads: Encoder threads (0 = let FFmpeg decide)
+            cpu_affinity: CPUs to pin the FFmpeg process to (Linux only)
         """
         self.stream_name = stream_name
         self.video_path = video_path
         self.rtsp_url = rtsp_url
+        self.rtsp_urls = [rtsp_url]
         self.loop = loop
         self.fps = fps
         self.codec = codec
         self.preset = preset
         self.bitrate = bitrate
         self.pixel_format = pixel_format
+        self.force_reencode = force_reencode
+        self.accel = accel
+        self.threads = threads
+        self.cpu_affinity = cpu_affinity
         
         self.process: Optional[subprocess.Popen] = None
-        self.thread: Optional[threading.Thread] = None
+        self._reactor = get_reactor()
+        self._stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+        self._backoff = BACKOFF_INITIAL
+        self._spawn_time = 0.0
+        self.restart_breaker: Optional[RestartBreaker] = None
+        # Running flag and error count live in (possibly shared) flat arrays
+        # so the orchestrator can scan all publishers without attribute lookups
+        self._state_index = 0
+        self._running_flags = bytearray(1)
+        self._error_counts = array("i", [0])
+        
         self.running = False
         self.error_count = 0
         self.frame_count = 0
@@ -65,19 +176,54 @@ class RTSPStreamPublisher:
         # Get video properties
         self._get_video_properties()
         
+        # The FFmpeg command never changes, so build it once for every (re)start
+        self._compile_command()
+        
+    @property
+    def running(self) -> bool:
+        """Whether the stream is meant to be publishing"""
+        return bool(self._running_flags[self._state_index])
+    
+    @running.setter
+    def running(self, value: bool):
+        self._running_flags[self._state_index] = 1 if value else 0
+    
+    @property
+    def error_count(self) -> int:
+        """Number of FFmpeg failures so far"""
+        return self._error_counts[self._state_index]
+    
+    @error_count.setter
+    def error_count(self, value: int):
+        self._error_counts[self._state_index] = value
+    
+    def bind_state(self, running_flags: bytearray, error_counts: array, index: int):
+        """
+        Move this publisher's running flag and error count into shared arrays
+        
+        Args:
+            running_flags: Shared running flags, one byte per publisher
+            error_counts: Shared error counts, one int per publisher
+            index: Slot of this publisher in both arrays
+        """
+        running_flags[index] = self._running_flags[self._state_index]
+        error_counts[index] = self._error_counts[self._state_index]
+        self._running_flags = running_flags
+        self._error_counts = error_counts
+        self._state_index = index
+    
     def _get_video_properties(self):
-        """Extract video properties using OpenCV"""
-        cap = cv2.VideoCapture(self.video_path)
-        if not cap.isOpened():
-            raise ValueError(f"Cannot open video file: {self.video_path}")
-        
-        self.video_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.video_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        self.video_fps = cap.get(cv2.CAP_PROP_FPS)
-        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        """Extract video properties, probing each file only once per process"""
+        (
+            self.video_width,
+            self.video_height,
+            self.video_fps,
+            self.total_frames,
+            self.video_codec,
+            self.video_pix_fmt,
+        ) = _probe_video(self.video_path)
         self.duration = self.total_frames / self.video_fps if self.video_fps > 0 else 0
-        
-        cap.release()
+        self.resolution = f"{self.video_width}x{self.video_height}"
         
         logger.info(
             f"[{self.stream_name}] Video properties: "
@@ -85,6 +231,11 @@ class RTSPStreamPublisher:
             f"{self.total_frames} frames, {self.duration:.2f}s duration"
         )
     
+    def _compile_command(self):
+        """Build and cache the FFmpeg argv and its printable form"""
+        self._argv = self._build_ffmpeg_command()
+        self._argv_str = shlex.join(self._argv)
+    
     def _build_ffmpeg_command(self) -> list:
         """Build FFmpeg command for streaming"""
         # Input options
@@ -96,23 +247,65 @@ class RTSPStreamPublisher:
             "-i", self.video_path
         ]
         
-        # Output options
-        output_opts = [
+        if self._use_hw_encoder():
+            input_opts = hwaccel_global_opts(self.accel) + input_opts
+        
+        command = ["ffmpeg"] + input_opts + self._build_encode_opts() + self._build_output_opts()
+        
+        return command
+    
+    def _can_stream_copy(self) -> bool:
+        """Check whether the source already matches the H.264 output settings"""
+        return (
+            not self.force_reencode and
+            self.codec == "libx264" and
+            self.video_codec == "h264" and
+            self.video_pix_fmt == self.pixel_format and
+            round(self.video_fps) == self.fps
+        )
+    
+    def _use_hw_encoder(self) -> bool:
+        """Check whether H.264 encoding is offloaded to a hardware encoder"""
+        return self.accel in HW_ENCODERS and self.codec == "libx264" and not self._can_stream_copy()
+    
+    def _build_encode_opts(self) -> list:
+        """Build FFmpeg video encoding options"""
+        # Skip the encoder entirely when the source is already compatible
+        if self._can_stream_copy():
+            return ["-c:v", "copy", "-bsf:v", "h264_mp4toannexb"]
+        
+        if self._use_hw_encoder():
+            encoder, encoder_opts = HW_ENCODERS[self.accel]
+            return [
+                "-c:v", encoder,
+                *encoder_opts,
+                "-b:v", self.bitrate,
+                "-r", str(self.fps),
+                "-g", str(self.fps * 2),
+            ]
+        
+        encode_opts = [
             "-c:v", self.codec,
             "-preset", self.preset,
             "-b:v", self.bitrate,
             "-pix_fmt", self.pixel_format,
             "-r", str(self.fps),
-            "-f", "rtsp",
             "-g", str(self.fps * 2),  
             "-keyint_min", str(self.fps),
             "-sc_threshold", "0",
-            "-rtsp_transport", "tcp",
         ]
+        if self.threads:
+            encode_opts += ["-threads", str(self.threads)]
         
-        command = ["ffmpeg"] + input_opts + output_opts + [self.rtsp_url]
-        
-        return command
+        return encode_opts
+    
+    def _build_output_opts(self) -> list:
+        """Build FFmpeg output options"""
+        return [
+            "-f", "rtsp",
+            "-rtsp_transport", "tcp",
+            self.rtsp_url
+        ]
     
     def start(self):
         """Start publishing the stream"""
@@ -122,47 +315,116 @@ class RTSPStreamPublisher:
         
         self.running = True
         self.start_time = time.time()
-        self.thread = threading.Thread(target=self._publish_loop, daemon=True)
-        self.thread.start()
+        self._spawn()
         
-        logger.info(f"[{self.stream_name}] Started publishing to {self.rtsp_url}")
+        logger.info(f"[{self.stream_name}] Started publishing to {', '.join(self.rtsp_urls)}")
     
-    def _publish_loop(self):
-        """Main publishing loop"""
-        while self.running:
-            try:
-                command = self._build_ffmpeg_command()
-                
-                logger.debug(f"[{self.stream_name}] FFmpeg command: {' '.join(command)}")
-                
-                # Start FFmpeg process
-                self.process = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    universal_newlines=True
-                )
-                
-                # Monitor the process
-                while self.running and self.process.poll() is None:
-                    time.sleep(0.1)
-                
-                # Check if process ended unexpectedly
-                if self.running:
-                    stderr_output = self.process.stderr.read() if self.process.stderr else ""
-                    logger.error(
-                        f"[{self.stream_name}] FFmpeg process ended unexpectedly. "
-                        f"Error: {stderr_output[:500]}"
-                    )
-                    self.error_count += 1
-                    
-                    # Wait before restarting
-                    time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"[{self.stream_name}] Error in publish loop: {e}")
-                self.error_count += 1
-                time.sleep(2)
+    def _spawn(self):
+        """Launch FFmpeg and hand its exit notification to the reactor"""
+        if not self.running:
+            return
+        
+        breaker = self.restart_breaker
+        if breaker is not None and breaker.is_open():
+            self._reactor.call_later(breaker.remaining(), self._spawn)
+            return
+        
+        try:
+            # Formatted by loguru only if DEBUG is actually enabled
+            logger.debug("[{}] FFmpeg command: {}", self.stream_name, self._argv_str)
+            
+            # Start FFmpeg process; stderr is drained continuously so a
+            # chatty FFmpeg never stalls on a full pipe
+            self._stderr_tail.clear()
+            process = subprocess.Popen(
+                self._argv,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
+            )
+            self.process = process
+            self._spawn_time = time.monotonic()
+            self._apply_cpu_affinity(process)
+            self._reactor.watch_readable(process.stderr, lambda: self._on_stderr_ready(process))
+            self._reactor.watch(process, self._on_exit)
+            
+        except Exception as e:
+            logger.error(f"[{self.stream_name}] Error starting FFmpeg: {e}")
+            self.error_count += 1
+            self._schedule_restart()
+    
+    def _apply_cpu_affinity(self, process: subprocess.Popen):
+        """Pin the FFmpeg process to its CPUs so encoders keep their own caches"""
+        if not self.cpu_affinity:
+            return
+        try:
+            os.sched_setaffinity(process.pid, self.cpu_affinity)
+        except AttributeError:
+            pass  # Not supported on this platform
+        except OSError as e:
+            logger.warning(f"[{self.stream_name}] Could not set CPU affinity: {e}")
+    
+    def _on_exit(self, process: subprocess.Popen):
+        """Handle FFmpeg exiting, restarting it unless the stream was stopped"""
+        if not self.running or process is not self.process:
+            return
+        
+        # Pick up anything written just before exit, then report the tail
+        while self._read_stderr(process):
+            pass
+        stderr_output = "\n".join(self._stderr_tail)
+        logger.error(
+            f"[{self.stream_name}] FFmpeg process ended unexpectedly. "
+            f"Error: {stderr_output[-500:]}"
+        )
+        self.error_count += 1
+        
+        # A long healthy run means this failure is not part of an outage
+        if time.monotonic() - self._spawn_time >= CLEAN_RUN_SECONDS:
+            self._backoff = BACKOFF_INITIAL
+        self._schedule_restart()
+    
+    def _schedule_restart(self):
+        """Restart FFmpeg after a jittered exponential backoff, or give up"""
+        if self.error_count >= MAX_ERRORS:
+            logger.error(
+                f"[{self.stream_name}] Giving up after {self.error_count} FFmpeg failures"
+            )
+            self.running = False
+            return
+        
+        delay = min(self._backoff, BACKOFF_MAX) * (0.5 + random.random())
+        self._backoff *= 2
+        
+        # Wait out a tripped breaker instead of joining a reconnect storm
+        if self.restart_breaker is not None:
+            delay = max(delay, self.restart_breaker.remaining())
+        
+        self._reactor.call_later(delay, self._spawn)
+    
+    def _read_stderr(self, process: subprocess.Popen) -> Optional[bytes]:
+        """
+        Read available FFmpeg stderr into the tail buffer without blocking
+        
+        Returns:
+            The bytes read, b"" at EOF, or None if no data is available yet
+        """
+        try:
+            data = os.read(process.stderr.fileno(), 65536)
+        except BlockingIOError:
+            return None
+        except (OSError, ValueError):
+            return b""  # Pipe already closed
+        
+        if data:
+            self._stderr_tail.extend(data.decode(errors="replace").splitlines())
+        return data
+    
+    def _on_stderr_ready(self, process: subprocess.Popen) -> bool:
+        """Reactor callback for FFmpeg stderr; returns False once the pipe is done"""
+        if self._read_stderr(process) == b"":
+            process.stderr.close()
+            return False
+        return True
     
     def stop(self):
         """Stop publishing the stream"""
@@ -180,33 +442,97 @@ class RTSPStreamPublisher:
             except Exception as e:
                 logger.error(f"[{self.stream_name}] Error stopping process: {e}")
         
-        # Wait for thread to finish
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=5)
-        
         logger.info(f"[{self.stream_name}] Stream stopped")
     
+    def is_alive(self) -> bool:
+        """Check if the FFmpeg process is currently running"""
+        return self.process is not None and self.process.returncode is None
+    
+    def snapshot(self, now: Optional[float] = None) -> StreamSnapshot:
+        """
+        Capture stream statistics in one pass
+        
+        Args:
+            now: Current time.time(), to share one clock read across publishers
+        """
+        if now is None:
+            now = time.time()
+        return StreamSnapshot(
+            self.stream_name,
+            self.rtsp_url,
+            self.running,
+            now - self.start_time if self.start_time else 0,
+            self.error_count,
+            self.video_path,
+            self.resolution,
+            self.fps,
+            self.is_alive()
+        )
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get stream statistics"""
-        uptime = time.time() - self.start_time if self.start_time else 0
-        
-        return {
-            "stream_name": self.stream_name,
-            "rtsp_url": self.rtsp_url,
-            "running": self.running,
-            "uptime_seconds": uptime,
-            "error_count": self.error_count,
-            "video_path": self.video_path,
-            "resolution": f"{self.video_width}x{self.video_height}",
-            "fps": self.fps,
-            "is_alive": self.thread.is_alive() if self.thread else False
-        }
+        return self.snapshot().as_stats()
+    
+    def sink_snapshots(self, now: Optional[float] = None) -> List[StreamSnapshot]:
+        """Get a snapshot for each RTSP stream this publisher feeds"""
+        return [self.snapshot(now)]
     
     def is_healthy(self) -> bool:
         """Check if stream is healthy"""
         return (
             self.running and
-            self.thread is not None and
-            self.thread.is_alive() and
-            self.error_count < 10
+            self.error_count < MAX_ERRORS
         )
+
+
+class RTSPFanoutPublisher(RTSPStreamPublisher):
+    """Publishes one encode of a video file to several RTSP streams via FFmpeg's tee muxer"""
+    
+    def __init__(
+        self,
+        stream_names: List[str],
+        video_path: str,
+        rtsp_urls: List[str],
+        **kwargs
+    ):
+        """
+        Initialize RTSP fan-out publisher
+        
+        Args:
+            stream_names: Names of the streams, one per RTSP URL
+            video_path: Path to video file
+            rtsp_urls: Full RTSP URLs to publish to
+            **kwargs: Encoding options passed to RTSPStreamPublisher
+        """
+        if len(stream_names) != len(rtsp_urls):
+            raise ValueError("stream_names and rtsp_urls must have the same length")
+        
+        super().__init__(
+            stream_name=f"{stream_names[0]}..{stream_names[-1]}",
+            video_path=video_path,
+            rtsp_url=rtsp_urls[0],
+            **kwargs
+        )
+        self.stream_names = list(stream_names)
+        self.rtsp_urls = list(rtsp_urls)
+        self._compile_command()
+    
+    def _build_output_opts(self) -> list:
+        """Build tee muxer output so a single encode feeds every RTSP sink"""
+        # Default onfail=abort: a dropped sink fails the process, which is
+        # restarted and counted as an error for every stream it carries
+        sinks = "|".join(f"[f=rtsp:rtsp_transport=tcp]{url}" for url in self.rtsp_urls)
+        return ["-map", "0:v", "-f", "tee", sinks]
+    
+    def sink_snapshots(self, now: Optional[float] = None) -> List[StreamSnapshot]:
+        """
+        Get a snapshot for each RTSP stream
+        
+        All sinks live in one FFmpeg process that aborts when any of them
+        fails, so the process-level state and error count apply to each.
+        """
+        snapshot = self.snapshot(now)
+        return [
+            snapshot._replace(stream_name=name, rtsp_url=url)
+            for name, url in zip(self.stream_names, self.rtsp_urls)
+        ]
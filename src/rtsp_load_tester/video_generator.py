@@ -4,23 +4,525 @@ Creates dummy video files for testing
 """
 
 import cv2
+import mmap
 import numpy as np
+import queue
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import List, Optional
 from loguru import logger
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Also runnable as a plain script (python video_generator.py) outside the package
+try:
+    from .encoders import HW_ENCODERS, hwaccel_global_opts, resolve_accel
+except ImportError:
+    from encoders import HW_ENCODERS, hwaccel_global_opts, resolve_accel
+
+# Optional JIT compiler for the per-pixel gradient kernel
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Frame buffers shared between a generator loop and its encoder thread
+WRITER_POOL_FRAMES = 4
+
+
+# Complete set of test videos as (generator method, arguments)
+TEST_VIDEOS = [
+    # Video 1: Color bars (HD)
+    ("generate_color_bars_video", dict(
+        filename="dummy_video1.mp4", duration=30, fps=30, width=1920, height=1080
+    )),
+    # Video 2: Animated pattern (HD 720p)
+    ("generate_animated_pattern_video", dict(
+        filename="dummy_video2.mp4", duration=30, fps=25, width=1280, height=720
+    )),
+    # Video 3: Gradient (Full HD)
+    ("generate_gradient_video", dict(
+        filename="dummy_video3.mp4", duration=30, fps=30, width=1920, height=1080
+    )),
+]
+
+
+if HAS_NUMBA:
+    @lru_cache(maxsize=None)
+    def _gradient_kernel(width: int, height: int):
+        """
+        Compile a gradient kernel for one frame size
+        
+        The size is captured by the closure, so numba treats it as a
+        compile-time constant: loop bounds and scale factors are folded.
+        Closures cannot use numba's on-disk cache, so each process compiles
+        once per frame size.
+        """
+        @numba.njit(parallel=True, fastmath=True)
+        def fill_gradient(frame, offset):
+            """Write one gradient frame in place, rows split across cores"""
+            for y in numba.prange(height):
+                for x in range(width):
+                    frame[y, x, 0] = int(((x + y) / (width + height)) * 255 + offset) % 255
+                    frame[y, x, 1] = int((y / height) * 255)
+                    frame[y, x, 2] = int((x / width) * 255)
+        
+        return fill_gradient
+
+
+class FFmpegPipeWriter:
+    """
+    Encode raw BGR or I420 frames to an H.264 file by piping them into FFmpeg
+    
+    Frames are drawn into buffers taken from a small pool with acquire() and
+    handed back with write(); a background thread feeds them to FFmpeg and
+    returns them to the pool, so drawing and encoding overlap. Used as a
+    context manager, the encoder is aborted if generation raises.
+    """
+    
+    def __init__(
+        self,
+        output_path: Path,
+        fps: int,
+        width: int,
+        height: int,
+        accel: str = "none",
+        pix_fmt: str = "bgr24"
+    ):
+        """
+        Start the FFmpeg encoder process
+        
+        Args:
+            output_path: Output video file
+            fps: Frames per second
+            width: Frame width
+            height: Frame height
+            accel: Resolved hardware encoder ("none" or a key of HW_ENCODERS)
+            pix_fmt: Frame layout, "bgr24" or planar "yuv420p" as produced
+                by cv2.COLOR_BGR2YUV_I420 (needs even width and height)
+        """
+        self.output_path = output_path
+        self._process = subprocess.Popen(
+            _encode_command(output_path, fps, width, height, accel, pix_fmt, "-"),
+            stdin=subprocess.PIPE
+        )
+        
+        self._error: Optional[OSError] = None
+        self._pending = queue.Queue()
+        self._free = queue.Queue()
+        for _ in range(WRITER_POOL_FRAMES):
+            self._free.put(np.empty(_frame_shape(width, height, pix_fmt), dtype=np.uint8))
+        
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+    
+    def acquire(self) -> np.ndarray:
+        """Take a frame buffer to draw into, waiting while all are queued for encoding"""
+        return self._free.get()
+    
+    def write(self, frame: np.ndarray):
+        """Queue a frame buffer from acquire() for encoding"""
+        self._pending.put(frame)
+    
+    def _writer_loop(self):
+        """Pipe queued frames into FFmpeg and recycle their buffers"""
+        stdin = self._process.stdin
+        while True:
+            frame = self._pending.get()
+            if frame is None:
+                break
+            if self._error is None:
+                try:
+                    stdin.write(frame.data)
+                except OSError as e:
+                    # Keep recycling buffers so the generator loop never blocks
+                    self._error = e
+            self._free.put(frame)
+    
+    def release(self):
+        """Finish encoding and wait for FFmpeg to exit"""
+        self._pending.put(None)
+        self._thread.join()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass  # FFmpeg already exited, reported below
+        if self._process.wait() != 0 or self._error is not None:
+            raise RuntimeError(
+                f"FFmpeg failed to encode {self.output_path} (exit code {self._process.returncode})"
+            )
+    
+    def abort(self):
+        """Kill FFmpeg and stop the writer thread without finishing the video"""
+        self._process.kill()
+        self._pending.put(None)
+        self._thread.join()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        self._process.wait()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+
+
+class FFmpegSpoolWriter:
+    """
+    Spool raw frames to a memory-mapped file and encode them in one FFmpeg run
+    
+    Same acquire()/write()/release() interface as FFmpegPipeWriter, but frames
+    are drawn straight into the file's pages and drawing never waits on the
+    encoder. FFmpeg then reads the finished file sequentially with all its
+    threads. Needs disk space for the raw video (about 6 MB per 1080p frame).
+    Used as a context manager, the spool is removed if generation raises.
+    """
+    
+    def __init__(
+        self,
+        output_path: Path,
+        fps: int,
+        width: int,
+        height: int,
+        total_frames: int,
+        accel: str = "none",
+        pix_fmt: str = "bgr24"
+    ):
+        """
+        Create the spool file
+        
+        Args:
+            output_path: Output video file; the spool is written next to it
+            fps: Frames per second
+            width: Frame width
+            height: Frame height
+            total_frames: Number of frames that will be written
+            accel: Resolved hardware encoder ("none" or a key of HW_ENCODERS)
+            pix_fmt: Frame layout, "bgr24" or planar "yuv420p"
+        """
+        if total_frames <= 0:
+            raise ValueError(f"total_frames must be positive, got {total_frames}")
+        
+        self.output_path = output_path
+        self._spool_path = output_path.with_name(output_path.name + ".raw")
+        self._command = _encode_command(
+            output_path, fps, width, height, accel, pix_fmt, str(self._spool_path)
+        )
+        shape = (total_frames,) + _frame_shape(width, height, pix_fmt)
+        size = int(np.prod(shape))
+        
+        # Mapped by hand rather than with np.memmap so release() can close the
+        # mapping explicitly; Windows cannot delete a file that is still mapped
+        self._file = open(self._spool_path, "w+b")
+        try:
+            self._file.truncate(size)
+            self._mmap = mmap.mmap(self._file.fileno(), size)
+        except BaseException:
+            self._file.close()
+            self._spool_path.unlink(missing_ok=True)
+            raise
+        self._frames = np.frombuffer(self._mmap, dtype=np.uint8).reshape(shape)
+        self._index = 0
+    
+    def acquire(self) -> np.ndarray:
+        """Return the spool slot of the next frame to draw into"""
+        return self._frames[self._index]
+    
+    def write(self, frame: np.ndarray):
+        """Commit the frame drawn into the slot from acquire()"""
+        self._index += 1
+    
+    def release(self):
+        """
+        Encode the spooled frames and remove the spool file
+        
+        Callers must drop the frames from acquire() first; closing the
+        mapping fails with BufferError while any of them is still alive.
+        """
+        del self._frames
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+        try:
+            result = subprocess.run(self._command)
+        finally:
+            self._spool_path.unlink()
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"FFmpeg failed to encode {self.output_path} (exit code {result.returncode})"
+            )
+    
+    def abort(self):
+        """Close the mapping and remove the spool file without encoding"""
+        self._frames = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # Frames still referenced by the traceback; unmapped when it is freed
+        self._file.close()
+        try:
+            self._spool_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not remove spool file {self._spool_path}: {e}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+
+
+def _frame_shape(width: int, height: int, pix_fmt: str) -> tuple:
+    """Shape of one raw frame buffer in the given pixel format"""
+    return (height * 3 // 2, width) if pix_fmt == "yuv420p" else (height, width, 3)
+
+
+def _encode_command(
+    output_path: Path,
+    fps: int,
+    width: int,
+    height: int,
+    accel: str,
+    pix_fmt: str,
+    source: str
+) -> List[str]:
+    """Build the FFmpeg command encoding raw frames from source ("-" = stdin) to H.264"""
+    if accel in HW_ENCODERS:
+        encoder, encoder_opts = HW_ENCODERS[accel]
+        encode = ["-c:v", encoder] + encoder_opts
+    else:
+        encode = ["-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p"]
+    
+    return (
+        ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+        + hwaccel_global_opts(accel)
+        + [
+            "-f", "rawvideo",
+            "-pix_fmt", pix_fmt,
+            "-s", f"{width}x{height}",
+            "-r", str(fps),
+            "-i", source,
+        ]
+        + encode
+        + ["-threads", "0", str(output_path)]
+    )
+
+
+class GlyphAtlas:
+    """
+    Draw text from glyph masks rendered once with cv2.putText
+    
+    Frame overlays only vary in their digits, so each character is
+    rasterized on first use and later text is composed from cached
+    antialiased masks and alpha-blended into the frame.
+    """
+    
+    def __init__(
+        self,
+        font_face: int = cv2.FONT_HERSHEY_SIMPLEX,
+        font_scale: float = 1,
+        thickness: int = 1,
+        outline: int = 0
+    ):
+        """
+        Initialize glyph atlas
+        
+        Args:
+            font_face: OpenCV Hershey font
+            font_scale: Font scale factor
+            thickness: Stroke thickness of the text fill
+            outline: Extra stroke thickness of a text outline (0 = no outline)
+        """
+        self.font_face = font_face
+        self.font_scale = font_scale
+        self.thickness = thickness
+        self.outline = outline
+        
+        (_, ascent), descent = cv2.getTextSize("0", font_face, font_scale, thickness + outline)
+        self._pad = thickness + outline + 2
+        self._top = ascent + self._pad
+        self._height = self._top + descent + self._pad
+        
+        # Rendered width exceeds the sum of advances by a constant stroke margin
+        width = self._text_width("0")
+        self._margin = width - (self._text_width("00") - width)
+        
+        self._glyphs = {}
+    
+    def _text_width(self, text: str) -> int:
+        """Width of text as measured by OpenCV"""
+        return cv2.getTextSize(text, self.font_face, self.font_scale, self.thickness)[0][0]
+    
+    def _glyph(self, char: str) -> tuple:
+        """Return (advance, fill mask, outline mask) for a character, rendering it on first use"""
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            advance = self._text_width(char * 2) - self._text_width(char)
+            shape = (self._height, advance + 2 * self._pad)
+            org = (self._pad, self._top)
+            
+            fill = np.zeros(shape, dtype=np.uint8)
+            cv2.putText(fill, char, org, self.font_face, self.font_scale, 255, self.thickness, cv2.LINE_AA)
+            
+            outline = None
+            if self.outline:
+                outline = np.zeros(shape, dtype=np.uint8)
+                cv2.putText(outline, char, org, self.font_face, self.font_scale, 255,
+                            self.thickness + self.outline, cv2.LINE_AA)
+            
+            glyph = self._glyphs[char] = (advance, fill, outline)
+        return glyph
+    
+    def text_size(self, text: str) -> tuple:
+        """Return (width, height) of text like cv2.getTextSize"""
+        width = sum(self._glyph(char)[0] for char in text) + self._margin
+        return width, self._top - self._pad
+    
+    def text_box(self, text: str, org: tuple) -> tuple:
+        """Return the (x0, y0, x1, y1) box that put_text may touch for text at org"""
+        x0 = org[0] - self._pad
+        y0 = org[1] - self._top
+        width = sum(self._glyph(char)[0] for char in text) + 2 * self._pad
+        return x0, y0, x0 + width, y0 + self._height
+    
+    def put_text(self, frame: np.ndarray, text: str, org: tuple, color: tuple = (255, 255, 255),
+                 outline_color: tuple = (0, 0, 0)):
+        """
+        Draw text onto a BGR frame like cv2.putText
+        
+        Args:
+            frame: Frame to draw into
+            text: Text to draw
+            org: Bottom-left corner of the text baseline
+            color: Text fill color
+            outline_color: Text outline color (used when the atlas has an outline)
+        """
+        glyphs = [self._glyph(char) for char in text]
+        width = sum(glyph[0] for glyph in glyphs) + 2 * self._pad
+        
+        # Compose the text masks; neighbouring glyph tiles overlap in their padding
+        fill = np.zeros((self._height, width), dtype=np.uint8)
+        outline = np.zeros_like(fill) if self.outline else None
+        x = 0
+        for advance, glyph_fill, glyph_outline in glyphs:
+            x_end = x + glyph_fill.shape[1]
+            np.maximum(fill[:, x:x_end], glyph_fill, out=fill[:, x:x_end])
+            if outline is not None:
+                np.maximum(outline[:, x:x_end], glyph_outline, out=outline[:, x:x_end])
+            x += advance
+        
+        # Clip the text box to the frame
+        x0 = org[0] - self._pad
+        y0 = org[1] - self._top
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1 = min(x0 + width, frame.shape[1])
+        fy1 = min(y0 + self._height, frame.shape[0])
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+        
+        region = frame[fy0:fy1, fx0:fx1]
+        masks = slice(fy0 - y0, fy1 - y0), slice(fx0 - x0, fx1 - x0)
+        if outline is not None:
+            _blend(region, outline[masks], outline_color)
+        _blend(region, fill[masks], color)
+
+
+def _debug_enabled() -> bool:
+    """Check once whether any log sink accepts DEBUG messages"""
+    try:
+        return logger._core.min_level <= logger.level("DEBUG").no
+    except AttributeError:
+        return True  # Unknown loguru internals, keep logging
+
+
+def _enable_opencl() -> bool:
+    """Turn on OpenCV's OpenCL T-API, returning False if no device is available"""
+    if not cv2.ocl.haveOpenCL():
+        return False
+    cv2.ocl.setUseOpenCL(True)
+    return cv2.ocl.useOpenCL()
+
+
+def _i420_planes(frame: np.ndarray, width: int, height: int) -> tuple:
+    """Return (Y, U, V) plane views of an I420 frame"""
+    flat = frame.reshape(-1)
+    size = width * height
+    y = flat[:size].reshape(height, width)
+    u = flat[size:size * 5 // 4].reshape(height // 2, width // 2)
+    v = flat[size * 5 // 4:].reshape(height // 2, width // 2)
+    return y, u, v
+
+
+def _blend(region: np.ndarray, alpha: np.ndarray, color: tuple):
+    """Alpha-blend a solid color into a BGR region in place using an 8-bit mask"""
+    alpha = alpha[..., None].astype(np.uint16)
+    blended = region * (255 - alpha) + np.array(color, dtype=np.uint16) * alpha
+    region[:] = (blended + 127) // 255
 
 
 class DummyVideoGenerator:
     """Generate dummy test videos with various patterns"""
     
-    def __init__(self, output_dir: str = "videos"):
+    def __init__(
+        self,
+        output_dir: str = "videos",
+        accel: str = "auto",
+        opencl: bool = False,
+        spool: bool = False
+    ):
         """
         Initialize video generator
         
         Args:
             output_dir: Directory to save generated videos
+            accel: Hardware H.264 encoder ("auto", "none" or a key of HW_ENCODERS)
+            opencl: Rasterize animated shapes with OpenCV's OpenCL T-API
+                (falls back to the CPU if no device is available)
+            spool: Write raw frames to a memory-mapped file and encode it in
+                one FFmpeg run instead of piping frames while drawing
         """
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+        self.accel = accel
+        self.opencl = opencl
+        self.spool = spool
+        self._dir_ready = False
+        self._accel_resolved = False
+    
+    def _ensure_dir(self):
+        """Create the output directory before the first video is written"""
+        if not self._dir_ready:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+    
+    def _resolve_accel(self, probe: bool = True):
+        """Resolve the configured encoder once per generator"""
+        if not self._accel_resolved:
+            self.accel = resolve_accel(self.accel, probe)
+            self._accel_resolved = True
+    
+    def _open_writer(
+        self,
+        output_path: Path,
+        fps: int,
+        width: int,
+        height: int,
+        total_frames: int,
+        pix_fmt: str = "bgr24"
+    ):
+        """Open an H.264 writer, preferring a hardware encoder"""
+        self._ensure_dir()
+        self._resolve_accel()
+        if self.spool:
+            return FFmpegSpoolWriter(output_path, fps, width, height, total_frames, self.accel, pix_fmt)
+        return FFmpegPipeWriter(output_path, fps, width, height, self.accel, pix_fmt)
     
     def generate_color_bars_video(
         self,
@@ -42,63 +544,87 @@ class DummyVideoGenerator:
         """
         output_path = self.output_dir / filename
         
-        # Define codec and create VideoWriter
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
-        
         total_frames = duration * fps
         
-        logger.info(f"Generating color bars video: {filename}")
-        logger.info(f"  Duration: {duration}s, FPS: {fps}, Resolution: {width}x{height}")
-        
-        # Color bars (RGB)
-        colors = [
-            (255, 255, 255),  # White
-            (255, 255, 0),    # Yellow
-            (0, 255, 255),    # Cyan
-            (0, 255, 0),      # Green
-            (255, 0, 255),    # Magenta
-            (255, 0, 0),      # Red
-            (0, 0, 255),      # Blue
-            (0, 0, 0),        # Black
-        ]
-        
-        bar_width = width // len(colors)
-        
-        for frame_num in range(total_frames):
-            # Create frame with color bars
-            frame = np.zeros((height, width, 3), dtype=np.uint8)
+        # Frames are built directly in I420, the encoder's input format
+        with self._open_writer(output_path, fps, width, height, total_frames, pix_fmt="yuv420p") as out:
+            logger.info(f"Generating color bars video: {filename}")
+            logger.info(f"  Duration: {duration}s, FPS: {fps}, Resolution: {width}x{height}")
+            
+            # Color bars (RGB)
+            colors = [
+                (255, 255, 255),  # White
+                (255, 255, 0),    # Yellow
+                (0, 255, 255),    # Cyan
+                (0, 255, 0),      # Green
+                (255, 0, 255),    # Magenta
+                (255, 0, 0),      # Red
+                (0, 0, 255),      # Blue
+                (0, 0, 0),        # Black
+            ]
             
-            # Draw color bars
-            for i, color in enumerate(colors):
-                x_start = i * bar_width
-                x_end = (i + 1) * bar_width if i < len(colors) - 1 else width
-                frame[:, x_start:x_end] = color
+            bar_width = width // len(colors)
             
-            # Add frame counter
-            text = f"Frame: {frame_num + 1}/{total_frames}"
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            font_scale = 2
-            thickness = 3
+            # The bars never change, so build them once and copy per frame;
+            # the last bar absorbs the remainder of the width
+            palette = np.array(colors, dtype=np.uint8)[:, ::-1]  # RGB -> BGR
+            counts = np.full(len(colors), bar_width)
+            counts[-1] = width - bar_width * (len(colors) - 1)
+            row = np.repeat(palette, counts, axis=0)
+            bars = np.ascontiguousarray(np.broadcast_to(row, (height, width, 3)))
+            background = cv2.cvtColor(bars, cv2.COLOR_BGR2YUV_I420)
             
-            # Get text size
-            (text_width, text_height), _ = cv2.getTextSize(text, font, font_scale, thickness)
+            # Frame counter text with a black outline
+            glyphs = GlyphAtlas(cv2.FONT_HERSHEY_SIMPLEX, font_scale=2, thickness=3, outline=2)
             
-            # Position text in center
-            x = (width - text_width) // 2
-            y = (height + text_height) // 2
+            # Hershey digits share one advance, so the text layout only changes
+            # with the number of digits in the counter
+            layouts = {}
             
-            # Draw text with black outline
-            cv2.putText(frame, text, (x, y), font, font_scale, (0, 0, 0), thickness + 2, cv2.LINE_AA)
-            cv2.putText(frame, text, (x, y), font, font_scale, (255, 255, 255), thickness, cv2.LINE_AA)
+            debug_enabled = _debug_enabled()
             
-            # Write frame
-            out.write(frame)
+            for frame_num in range(total_frames):
+                # Reset a pooled frame buffer to the color bars
+                frame = out.acquire()
+                np.copyto(frame, background)
+                
+                # Add frame counter
+                counter = str(frame_num + 1)
+                text = f"Frame: {counter}/{total_frames}"
+                
+                layout = layouts.get(len(counter))
+                if layout is None:
+                    # Position text in center
+                    text_width, text_height = glyphs.text_size(text)
+                    x = (width - text_width) // 2
+                    y = (height + text_height) // 2
+                    
+                    # Text box aligned to the 2x2 chroma grid
+                    x0, y0, x1, y1 = glyphs.text_box(text, (x, y))
+                    x0, y0 = max(x0, 0) & ~1, max(y0, 0) & ~1
+                    x1, y1 = min((x1 + 1) & ~1, width), min((y1 + 1) & ~1, height)
+                    layout = layouts[len(counter)] = (x, y, x0, y0, x1, y1)
+                x, y, x0, y0, x1, y1 = layout
+                
+                # Draw text with black outline on a BGR copy of its box and
+                # convert only that box to I420
+                box = bars[y0:y1, x0:x1].copy()
+                glyphs.put_text(box, text, (x - x0, y - y0))
+                box_planes = _i420_planes(cv2.cvtColor(box, cv2.COLOR_BGR2YUV_I420), x1 - x0, y1 - y0)
+                
+                for plane, box_plane, scale in zip(_i420_planes(frame, width, height), box_planes, (1, 2, 2)):
+                    plane[y0 // scale:y1 // scale, x0 // scale:x1 // scale] = box_plane
+                
+                # Write frame
+                out.write(frame)
+                
+                if debug_enabled and (frame_num + 1) % fps == 0:
+                    logger.debug("  Generated {}/{} frames", frame_num + 1, total_frames)
             
-            if (frame_num + 1) % fps == 0:
-                logger.debug(f"  Generated {frame_num + 1}/{total_frames} frames")
+            # Drop views of the writer's buffers so a spool file can be unmapped
+            frame = plane = None
+            out.release()
         
-        out.release()
         logger.info(f"Video saved: {output_path}")
         
         return str(output_path)
@@ -123,46 +649,70 @@ class DummyVideoGenerator:
         """
         output_path = self.output_dir / filename
         
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
-        
         total_frames = duration * fps
         
-        logger.info(f"Generating animated pattern video: {filename}")
-        logger.info(f"  Duration: {duration}s, FPS: {fps}, Resolution: {width}x{height}")
-        
-        for frame_num in range(total_frames):
-            # Create black background
-            frame = np.zeros((height, width, 3), dtype=np.uint8)
+        with self._open_writer(output_path, fps, width, height, total_frames) as out:
+            logger.info(f"Generating animated pattern video: {filename}")
+            logger.info(f"  Duration: {duration}s, FPS: {fps}, Resolution: {width}x{height}")
             
-            # Animate circles
-            angle = (frame_num / fps) * 2 * np.pi
+            # Precompute circle positions and colors as (frames, circles) arrays;
+            # float32 is plenty for values that end up as pixel coordinates
+            angles = np.arange(total_frames) / fps * 2 * np.pi
+            phases = np.arange(5) * (2 * np.pi / 5)
+            a = (angles[:, None] + phases[None, :]).astype(np.float32)
+            radius = np.float32(min(width, height) / 4)
+            xs = (width / 2 + np.cos(a) * radius).astype(np.int32).tolist()
+            ys = (height / 2 + np.sin(a) * radius).astype(np.int32).tolist()
+            colors = np.stack([
+                127 + 127 * np.sin(a),
+                127 + 127 * np.cos(a + np.pi / 3),
+                127 + 127 * np.sin(a + 2 * np.pi / 3),
+            ], axis=-1).astype(np.int32).tolist()
             
-            # Draw moving circles
-            for i in range(5):
-                phase = i * (2 * np.pi / 5)
-                x = int(width / 2 + np.cos(angle + phase) * min(width, height) / 4)
-                y = int(height / 2 + np.sin(angle + phase) * min(width, height) / 4)
-                
-                color = (
-                    int(127 + 127 * np.sin(angle + phase)),
-                    int(127 + 127 * np.cos(angle + phase + np.pi / 3)),
-                    int(127 + 127 * np.sin(angle + phase + 2 * np.pi / 3))
-                )
-                
-                cv2.circle(frame, (x, y), 50, color, -1)
+            glyphs = GlyphAtlas(cv2.FONT_HERSHEY_SIMPLEX, font_scale=1, thickness=2)
             
-            # Add timestamp
-            timestamp = f"Time: {frame_num / fps:.2f}s"
-            cv2.putText(frame, timestamp, (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 
-                       1, (255, 255, 255), 2, cv2.LINE_AA)
+            use_opencl = self.opencl and _enable_opencl()
+            if self.opencl and not use_opencl:
+                logger.warning("OpenCL not available, drawing on the CPU")
+            if use_opencl:
+                # Device-resident canvas, cleared from a device-resident blank frame
+                canvas = cv2.UMat(height, width, cv2.CV_8UC3)
+                blank = cv2.UMat(np.zeros((height, width, 3), dtype=np.uint8))
             
-            out.write(frame)
+            debug_enabled = _debug_enabled()
             
-            if (frame_num + 1) % fps == 0:
-                logger.debug(f"  Generated {frame_num + 1}/{total_frames} frames")
+            for frame_num in range(total_frames):
+                frame = out.acquire()
+                
+                # Clear to a black background
+                if use_opencl:
+                    cv2.copyTo(blank, None, canvas)
+                    target = canvas
+                else:
+                    frame.fill(0)
+                    target = frame
+                
+                # Draw moving circles
+                for x, y, color in zip(xs[frame_num], ys[frame_num], colors[frame_num]):
+                    cv2.circle(target, (x, y), 50, color, -1)
+                
+                if use_opencl:
+                    # Download into the pooled frame buffer
+                    np.copyto(frame, canvas.get())
+                
+                # Add timestamp
+                timestamp = f"Time: {frame_num / fps:.2f}s"
+                glyphs.put_text(frame, timestamp, (20, 40))
+                
+                out.write(frame)
+                
+                if debug_enabled and (frame_num + 1) % fps == 0:
+                    logger.debug("  Generated {}/{} frames", frame_num + 1, total_frames)
+            
+            # Drop views of the writer's buffers so a spool file can be unmapped
+            frame = target = None
+            out.release()
         
-        out.release()
         logger.info(f"Video saved: {output_path}")
         
         return str(output_path)
@@ -187,87 +737,102 @@ class DummyVideoGenerator:
         """
         output_path = self.output_dir / filename
         
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
-        
         total_frames = duration * fps
         
-        logger.info(f"Generating gradient video: {filename}")
-        logger.info(f"  Duration: {duration}s, FPS: {fps}, Resolution: {width}x{height}")
-        
-        for frame_num in range(total_frames):
-            # Create gradient
-            frame = np.zeros((height, width, 3), dtype=np.uint8)
+        with self._open_writer(output_path, fps, width, height, total_frames) as out:
+            logger.info(f"Generating gradient video: {filename}")
+            logger.info(f"  Duration: {duration}s, FPS: {fps}, Resolution: {width}x{height}")
             
-            # Animate color shift
-            offset = (frame_num / total_frames) * 255
+            glyphs = GlyphAtlas(cv2.FONT_HERSHEY_SIMPLEX, font_scale=1, thickness=2)
             
-            for y in range(height):
-                for x in range(width):
-                    r = int((x / width) * 255)
-                    g = int((y / height) * 255)
-                    b = int(((x + y) / (width + height)) * 255 + offset) % 255
-                    
-                    frame[y, x] = (b, g, r)
+            if HAS_NUMBA:
+                fill_gradient = _gradient_kernel(width, height)
+            else:
+                # Static parts of the gradient, computed once for all frames
+                # (float64, like the numba kernel, so values match it exactly)
+                xs = np.arange(width)
+                ys = np.arange(height)[:, None]
+                shape = (height, width)
+                r = np.ascontiguousarray(np.broadcast_to((xs / width * 255).astype(np.uint8), shape))
+                g = np.ascontiguousarray(np.broadcast_to((ys / height * 255).astype(np.uint8), shape))
+                
+                # Blue depends only on x + y, so one value per anti-diagonal
+                diagonals = np.arange(width + height - 1) / (width + height) * 255
+                b = np.empty(shape, dtype=np.uint8)
             
-            # Add info text
-            info_text = f"Frame {frame_num + 1}/{total_frames}"
-            cv2.putText(frame, info_text, (20, 40), cv2.FONT_HERSHEY_SIMPLEX,
-                       1, (255, 255, 255), 2, cv2.LINE_AA)
+            debug_enabled = _debug_enabled()
             
-            out.write(frame)
+            for frame_num in range(total_frames):
+                # Every pixel is overwritten, so the pooled buffer needs no clearing
+                frame = out.acquire()
+                # Animate color shift
+                offset = (frame_num / total_frames) * 255
+                
+                if HAS_NUMBA:
+                    fill_gradient(frame, offset)
+                else:
+                    # Only the blue channel changes per frame: shift the
+                    # diagonals, expand them to rows (row y starts at diagonal y),
+                    # then interleave the channels
+                    line = ((diagonals + offset).astype(np.int64) % 255).astype(np.uint8)
+                    np.copyto(b, sliding_window_view(line, width))
+                    cv2.merge([b, g, r], dst=frame)
+                
+                # Add info text
+                info_text = f"Frame {frame_num + 1}/{total_frames}"
+                glyphs.put_text(frame, info_text, (20, 40))
+                
+                out.write(frame)
+                
+                if debug_enabled and (frame_num + 1) % fps == 0:
+                    logger.debug("  Generated {}/{} frames", frame_num + 1, total_frames)
             
-            if (frame_num + 1) % fps == 0:
-                logger.debug(f"  Generated {frame_num + 1}/{total_frames} frames")
+            # Drop views of the writer's buffers so a spool file can be unmapped
+            frame = None
+            out.release()
         
-        out.release()
         logger.info(f"Video saved: {output_path}")
         
         return str(output_path)
     
-    def generate_all_test_videos(self):
-        """Generate a complete set of test videos"""
-        logger.info("Generating all test videos...")
-        
-        videos = []
+    def generate_all_test_videos(self, max_workers: Optional[int] = len(TEST_VIDEOS)):
+        """
+        Generate a complete set of test videos
         
-        # Video 1: Color bars (HD)
-        videos.append(
-            self.generate_color_bars_video(
-                "dummy_video1.mp4",
-                duration=30,
-                fps=30,
-                width=1920,
-                height=1080
-            )
-        )
+        Args:
+            max_workers: Generate videos in this many worker processes, one
+                video per process by default (None or 1 = generate
+                sequentially in this process)
+        """
+        logger.info("Generating all test videos...")
         
-        # Video 2: Animated pattern (HD 720p)
-        videos.append(
-            self.generate_animated_pattern_video(
-                "dummy_video2.mp4",
-                duration=30,
-                fps=25,
-                width=1280,
-                height=720
-            )
-        )
+        # Probe the encoder once here; workers reuse the result without probing
+        self._resolve_accel()
         
-        # Video 3: Gradient (Full HD)
-        videos.append(
-            self.generate_gradient_video(
-                "dummy_video3.mp4",
-                duration=30,
-                fps=30,
-                width=1920,
-                height=1080
+        if max_workers and max_workers > 1:
+            options = dict(
+                output_dir=str(self.output_dir), accel=self.accel, opencl=self.opencl, spool=self.spool
             )
-        )
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(TEST_VIDEOS))) as executor:
+                futures = [
+                    executor.submit(_generate_video, options, method, kwargs)
+                    for method, kwargs in TEST_VIDEOS
+                ]
+                videos = [future.result() for future in futures]
+        else:
+            videos = [getattr(self, method)(**kwargs) for method, kwargs in TEST_VIDEOS]
         
         logger.info(f"Generated {len(videos)} test videos")
         return videos
 
 
+def _generate_video(options: dict, method: str, kwargs: dict) -> str:
+    """Generate a single test video (runs in a worker process)"""
+    generator = DummyVideoGenerator(**options)
+    generator._resolve_accel(probe=False)
+    return getattr(generator, method)(**kwargs)
+
+
 if __name__ == "__main__":
     generator = DummyVideoGenerator()
     generator.generate_all_test_videos()